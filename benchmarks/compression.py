@@ -0,0 +1,29 @@
+"""This script benchmarks the compression of signals by thresholding
+their coefficients, reporting the compression ratio, reconstruction
+error and encode/decode throughput for each family and method. Run it
+from the root of the repository with: python -m benchmarks.compression
+"""
+
+
+import sp
+
+
+def main():
+    cases = [('square', sp.signals.square_signal(2**16)),
+             ('sinusoids', sp.signals.sum_of_sinusoids(
+                 2**16, [[3, 17], [8, 260], [2, 2900]]))]
+    methods = [('hard', 0.1), ('soft', 0.1), ('top_k', 64), ('energy', 0.999)]
+    print('{:10} {:8} {:8} {:>9} {:>10} {:>6} {:>12} {:>12}'.format(
+        'signal', 'family', 'method', 'ratio', 'error', 'kept',
+        'encode/s', 'decode/s'))
+    for name, signal in cases:
+        for family in ['Fourier', 'Haar']:
+            for method, parameter in methods:
+                r = sp.compression.report(signal, family, method, parameter)
+                print('{:10} {:8} {:8} {:9.1f} {:10.2e} {:6d} {:12.3e} {:12.3e}'.format(
+                    name, family, method, r['ratio'], r['error'], r['kept'],
+                    r['encode'], r['decode']))
+
+
+if __name__ == '__main__':
+    main()
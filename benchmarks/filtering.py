@@ -0,0 +1,46 @@
+"""This script benchmarks the convolution of signals with kernels of a
+range of lengths, directly and through the Fourier basis, reporting the
+time of each method, the method chosen automatically and whether it was
+the faster one. Run it from the root of the repository with:
+python -m benchmarks.filtering
+"""
+
+
+import time
+
+import numpy as np
+
+from sp import filtering
+
+
+def fastest(call, repeats=5):
+    """Return the fastest time (in seconds) of repeats calls."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    print('{:>8} {:>6} {:>12} {:>12} {:>7} {:>5}'.format(
+        'n', 'k', 'direct/s', 'fft/s', 'auto', 'best'))
+    wrong = 0
+    for n in [2**6, 2**10, 2**14, 2**18]:
+        for k in [3, 17, 65, 257, 1025]:
+            if k > n:
+                continue
+            signal, kernel = np.random.rand(n), np.random.rand(k)
+            direct = fastest(lambda: filtering.convolve(signal, kernel, method='direct'))
+            fft = fastest(lambda: filtering.convolve(signal, kernel, method='fft'))
+            auto = filtering.choose_method(n, k)
+            best = auto == ('direct' if direct <= fft else 'fft')
+            wrong += not best
+            print('{:8d} {:6d} {:12.3e} {:12.3e} {:>7} {:>5}'.format(
+                n, k, direct, fft, auto, 'yes' if best else 'no'))
+    print('{} choices were not the faster method.'.format(wrong))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""This script benchmarks the scaling of batch transforms across a pool
+of worker processes, from one worker up to the number of cores. Run it
+from the root of the repository with: python -m benchmarks.parallel
+"""
+
+
+import multiprocessing
+import time
+
+import numpy as np
+
+import sp
+
+
+def main():
+    cases = [('ifft', np.random.rand(4096, 4096), ()),
+             ('idwt', np.random.rand(4096, 4096), ('Haar',)),
+             ('idft2', np.random.rand(256, 256, 256), ())]
+    cores = multiprocessing.cpu_count()
+    counts = sorted({2**i for i in range(int(np.log2(cores)) + 1)} | {cores})
+    print('{:8} {:>8} {:>10} {:>8}'.format('name', 'workers', 'seconds', 'speedup'))
+    for name, signals, args in cases:
+        serial = None
+        for workers in counts:
+            with sp.parallel.Executor(workers) as executor:
+                executor.transform(name, signals[:workers], *args)
+                start = time.perf_counter()
+                executor.transform(name, signals, *args)
+                seconds = time.perf_counter() - start
+            serial = serial or seconds
+            print('{:8} {:8d} {:10.3f} {:8.2f}'.format(
+                name, workers, seconds, serial/seconds))
+
+
+if __name__ == '__main__':
+    main()
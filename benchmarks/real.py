@@ -0,0 +1,33 @@
+"""This script benchmarks the real Fast Fourier Transform (irfft, and its
+inverse rfft) against the complex one (ifft and fft) of the same real
+signals, reporting the time and the peak memory allocated (traced by
+tracemalloc) of each and their ratios. Run it from the root of the
+repository with: python -m benchmarks.real
+"""
+
+
+import numpy as np
+
+from sp.bases import fourier
+
+from .suite import measure, powers
+
+
+def main():
+    print('{:>8} {:>9} {:>12} {:>12} {:>7} {:>12} {:>12} {:>7}'.format(
+        'm', 'pair', 'complex/s', 'real/s', 'ratio', 'complex/B', 'real/B', 'ratio'))
+    for m in powers(8, 20, 2):
+        x = np.random.rand(m)
+        coeffs, half = fourier.ifft(x), fourier.irfft(x)
+        for pair, complex_call, real_call in [
+                ('analysis', lambda: fourier.ifft(x), lambda: fourier.irfft(x)),
+                ('synthesis', lambda: fourier.fft(coeffs), lambda: fourier.rfft(half, m))]:
+            complex_seconds, complex_peak, _ = measure(complex_call)
+            real_seconds, real_peak, _ = measure(real_call)
+            print('{:8d} {:>9} {:12.3e} {:12.3e} {:7.2f} {:12d} {:12d} {:7.2f}'.format(
+                m, pair, complex_seconds, real_seconds, real_seconds/complex_seconds,
+                complex_peak, real_peak, real_peak/complex_peak))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""This script benchmarks the transform service against transforming the
+same short signals one call at a time, reporting the throughput of each,
+the mean size of the batches formed and the latency of the requests.
+Run it from the root of the repository with:
+python -m benchmarks.service
+"""
+
+
+import asyncio
+import time
+
+import numpy as np
+
+from sp import parallel, service
+
+
+# The number of concurrent requests of each case.
+REQUESTS = 4096
+
+
+async def serve(name, signals, args):
+    """Return the seconds taken to transform the signals through a new
+    service, all requested at once, and the service's metrics.
+    """
+    transforms = service.Service()
+    start = time.perf_counter()
+    await asyncio.gather(*[transforms.transform(name, signal, *args)
+                           for signal in signals])
+    return time.perf_counter() - start, transforms.stats()
+
+
+def main():
+    print('{:>5} {:>6} {:>6} {:>10} {:>10} {:>7} {:>9} {:>9}'.format(
+        'name', 'family', 'm', 'single/s', 'service/s', 'batch', 'p50/ms', 'p99/ms'))
+    for name, args in [('idft', ()), ('ifft', ()), ('idwt', ('Haar',)),
+                       ('idwt', ('db4',))]:
+        function = parallel.transforms[name][0]
+        for m in [64, 512]:
+            signals = np.random.rand(REQUESTS, m)
+            start = time.perf_counter()
+            for signal in signals:
+                function(signal, *args)
+            single = time.perf_counter() - start
+            seconds, stats = asyncio.run(serve(name, signals, args))
+            print('{:>5} {:>6} {:6d} {:10.3f} {:10.3f} {:7.1f} {:9.2f} {:9.2f}'.format(
+                name, args[0] if args else '', m, single, seconds, stats['batch'],
+                1e3*stats['latency']['p50'], 1e3*stats['latency']['p99']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""This script benchmarks every transform, signal generator and plot
+helper over a sweep of sizes, recording the wall time, the peak memory
+allocated (traced by tracemalloc) and the peak resident memory of the
+process for each call. The results are written as JSON and may be
+compared with a saved baseline, in which case any case slower than the
+baseline by more than the threshold fails the run. Run it from the root
+of the repository with, e.g.:
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --quick --baseline results.json
+"""
+
+
+import argparse
+import gc
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+import sp
+from sp.bases import fourier, wavelets
+
+
+def powers(low, high, step=1):
+    """Return the powers of two from 2**low to 2**high."""
+    return [2**i for i in range(low, high + 1, step)]
+
+
+def plotted(function):
+    """Return the plot helper, function, closing its figures after it."""
+    def call(*args):
+        result = function(*args)
+        plt.close('all')
+        return result
+    return call
+
+
+# Each case is (name, sizes, build), where build(size) returns the call
+# to time. Cases that are O(m**2) (dense bases and per-cell plotting)
+# stop at smaller sizes.
+CASES = [
+    ('fourier.ifft', powers(4, 20, 2), lambda m: (
+        lambda x=np.random.rand(m): fourier.ifft(x))),
+    ('fourier.fft', powers(4, 20, 2), lambda m: (
+        lambda x=np.random.rand(m): fourier.fft(x))),
+    ('fourier.irfft', powers(4, 20, 2), lambda m: (
+        lambda x=np.random.rand(m): fourier.irfft(x))),
+    ('fourier.rfft', powers(4, 20, 2), lambda m: (
+        lambda x=fourier.irfft(np.random.rand(m)): fourier.rfft(x, m))),
+    ('fourier.idft', powers(4, 12, 2), lambda m: (
+        lambda x=np.random.rand(m): fourier.idft(x))),
+    ('fourier.dft', powers(4, 12, 2), lambda m: (
+        lambda x=np.random.rand(m): fourier.dft(x))),
+    ('fourier.fourier_matrix', powers(4, 12, 2), lambda m: (
+        lambda: fourier._fourier_matrix(m, 1))),
+    ('fourier.stft', powers(8, 20, 2), lambda m: (
+        lambda x=np.random.rand(m): fourier.stft(x, 64))),
+    ('fourier.idft_bins', powers(4, 20, 2), lambda m: (
+        lambda x=np.random.rand(m): fourier.idft_bins(x, [1, 5, 9]))),
+    ('fourier.idft2', powers(4, 12, 2), lambda m: (
+        lambda x=np.random.rand(m, m): fourier.idft2(x))),
+    ('fourier.dft2', powers(4, 12, 2), lambda m: (
+        lambda x=np.random.rand(m, m): fourier.dft2(x))),
+    ('wavelets.idwt', powers(4, 20, 2), lambda m: (
+        lambda x=np.random.rand(m): wavelets.idwt(x, 'Haar'))),
+    ('wavelets.dwt', powers(4, 20, 2), lambda m: (
+        lambda x=np.random.rand(m): wavelets.dwt(x, 'Haar'))),
+    ('wavelets.idwt_db4', powers(4, 20, 2), lambda m: (
+        lambda x=np.random.rand(m): wavelets.idwt(x, 'db4'))),
+    ('wavelets.dwt_db4', powers(4, 20, 2), lambda m: (
+        lambda x=np.random.rand(m): wavelets.dwt(x, 'db4'))),
+    ('wavelets.idwt_sym8_symmetric', powers(4, 20, 2), lambda m: (
+        lambda x=np.random.rand(m): wavelets.idwt(x, 'sym8', mode='symmetric'))),
+    ('wavelets.ipyramid', powers(4, 12, 2), lambda m: (
+        lambda x=np.random.rand(m, m): wavelets.ipyramid(x, 'Haar', out=x))),
+    ('wavelets.pyramid_preview', powers(4, 12, 2), lambda m: (
+        lambda x=wavelets.ipyramid(np.random.rand(m, m), 'Haar'):
+            wavelets.pyramid(x, 'Haar', level=2))),
+    ('wavelets.idwt2', powers(4, 12, 2), lambda m: (
+        lambda x=np.random.rand(m, m): wavelets.idwt2(x, 'Haar'))),
+    ('wavelets.dwt2', powers(4, 12, 2), lambda m: (
+        lambda x=np.random.rand(m, m): wavelets.dwt2(x, 'Haar'))),
+    ('wavelets.Haar.matrix', powers(4, 12, 2), lambda m: (
+        lambda: wavelets.Haar._matrix(m))),
+    ('wavelets.heatmap_matrix', powers(4, 20, 2), lambda m: (
+        lambda x=np.random.rand(m): wavelets.heatmap_matrix(x, 'Haar'))),
+    ('filtering.convolve', powers(4, 20, 2), lambda m: (
+        lambda x=np.random.rand(m), v=np.random.rand(max(m // 16, 1)):
+            sp.filtering.convolve(x, v))),
+    ('filtering.overlap_add', powers(4, 20, 2), lambda m: (
+        lambda x=np.random.rand(m), stream=sp.filtering.OverlapAdd(np.random.rand(64)):
+            stream.update(x))),
+    ('signals.sum_of_sinusoids', powers(4, 20, 2), lambda m: (
+        lambda: sp.signals.sum_of_sinusoids(m, [[3, 17], [8, 26], [2, 29]]))),
+    ('signals.square_signal', powers(4, 20, 2), lambda m: (
+        lambda: sp.signals.square_signal(m))),
+    ('signals.chequered', powers(4, 12, 2), lambda m: (
+        lambda: sp.signals.chequered(m, m, max(m // 16, 1)))),
+    ('signals.stripes', powers(4, 12, 2), lambda m: (
+        lambda: sp.signals.stripes(m, m, max(m // 16, 1)))),
+    ('signals.sinusoids_2d', powers(4, 12, 2), lambda m: (
+        lambda: sp.signals.sinusoids_2d(m, m, 5))),
+    ('plotting.plot', powers(4, 20, 4), lambda m: (
+        lambda x=np.random.rand(m): plotted(sp.plotting.plot)(x))),
+    ('plotting.live', powers(4, 20, 4), lambda m: (
+        lambda x=np.random.rand(m), view=sp.plotting.plot(np.random.rand(m), live=True):
+            view.send(x))),
+    ('plotting.plot_wavelet_heatmap', powers(2, 12, 2), lambda m: (
+        lambda x=np.random.rand(m): plotted(sp.plotting.plot_wavelet_heatmap)(x, 'Haar'))),
+]
+
+
+# The cases whose sizes are the sides of square images.
+TWO_D = {'fourier.idft2', 'fourier.dft2', 'wavelets.idwt2', 'wavelets.dwt2',
+         'wavelets.ipyramid', 'wavelets.pyramid_preview',
+         'signals.chequered', 'signals.stripes', 'signals.sinusoids_2d'}
+
+
+def measure(call, seconds=0.2, repeats=100):
+    """Return the fastest time (in seconds) of the call, repeated until
+    about seconds have elapsed (at most repeats times), the peak memory
+    (in bytes) traced during one call and the peak resident memory (in
+    kilobytes) of the process so far.
+    """
+    call()
+    gc.collect()
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    times = []
+    while not times or sum(times) < seconds and len(times) < repeats:
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return min(times), peak, rss
+
+
+def run(names=None, max_size=None, quick=False):
+    """Return the results of the cases (all if no names are given) for
+    sizes up to max_size. Quick runs stop at 2**12 (2**8 for 2-D) and
+    time each call once.
+    """
+    results = []
+    for name, sizes, build in CASES:
+        if names and name not in names:
+            continue
+        limit = max_size or float('inf')
+        if quick:
+            limit = min(limit, 2**8 if name in TWO_D else 2**12)
+        for size in [size for size in sizes if size <= limit]:
+            call = build(size)
+            seconds, peak, rss = measure(call, 0 if quick else 0.2)
+            results.append({'name': name, 'size': size, 'seconds': seconds,
+                            'peak_bytes': peak, 'max_rss_kb': rss})
+            print('{:32} {:>9} {:12.3e} s {:14d} B'.format(name, size, seconds, peak))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return a list of the results that are slower than those of the
+    same name and size in the baseline by more than the threshold (a
+    ratio of times).
+    """
+    previous = {(r['name'], r['size']): r for r in baseline['results']}
+    slower = []
+    for result in results:
+        before = previous.get((result['name'], result['size']))
+        if before and result['seconds'] > threshold*before['seconds']:
+            slower.append((result, result['seconds']/before['seconds']))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('names', nargs='*', help='the cases to run (default: all)')
+    parser.add_argument('--output', help='the JSON file to write the results to')
+    parser.add_argument('--baseline', help='a JSON file of results to compare with')
+    parser.add_argument('--threshold', type=float, default=1.5,
+                        help='the ratio of times above which a case fails')
+    parser.add_argument('--max-size', type=int, help='the largest size to run')
+    parser.add_argument('--quick', action='store_true',
+                        help='run small sizes only, timing each call once')
+    args = parser.parse_args(argv)
+    results = run(args.names, args.max_size, args.quick)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'python': platform.python_version(),
+                       'numpy': np.__version__,
+                       'machine': platform.machine(),
+                       'results': results}, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            slower = compare(results, json.load(f), args.threshold)
+        for result, ratio in slower:
+            print('SLOWER: {} (size {}) is {:.2f} times the baseline.'.format(
+                result['name'], result['size'], ratio), file=sys.stderr)
+        if slower:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
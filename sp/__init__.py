@@ -1,3 +1,25 @@
-from . import plotting
-from . import signals
-from . import bases
\ No newline at end of file
+"""This package provides signal generation, plotting and the Fourier
+and wavelet bases. Its submodules are imported on first access, so that
+importing sp alone does not pull in matplotlib or build any basis.
+"""
+
+
+import importlib
+
+
+_submodules = ('plotting', 'signals', 'bases', 'streaming', 'compression',
+               'outofcore', 'parallel', 'instrumentation', 'filtering',
+               'service', 'utils')
+
+
+def __getattr__(name):
+    """Import and return the submodule (or sp.stats) on first access."""
+    if name in _submodules:
+        return importlib.import_module('.' + name, __name__)
+    if name == 'stats':
+        return importlib.import_module('.instrumentation', __name__).stats
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_submodules) + ['stats'])
@@ -1,2 +1,20 @@
-from . import fourier
-from . import wavelets
\ No newline at end of file
+"""This package provides the Fourier and wavelet bases, whose modules
+are imported on first access.
+"""
+
+
+import importlib
+
+
+_submodules = ('batch', 'cache', 'plans', 'fourier', 'wavelets')
+
+
+def __getattr__(name):
+    """Import and return the submodule on first access."""
+    if name in _submodules:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_submodules))
@@ -0,0 +1,100 @@
+"""This module provides the functionality to apply transforms along the
+axes of N-dimensional arrays, so that a whole stack of signals (e.g.
+channels by samples or batch by rows by columns) is transformed in one
+vectorised call.
+"""
+
+
+import numpy as np
+
+
+def check(signal, axes, ndim):
+    """Return the signal as an array and the axes to transform along. If
+    no axes are given the signal must be ndim-dimensional (and all its
+    axes are transformed). Else raise a ValueError.
+    """
+    signal = np.asarray(signal)
+    if axes is None:
+        if signal.ndim != ndim:
+            raise ValueError('Signal is not {}-dimensional.'.format(ndim))
+        axes = 0 if ndim == 1 else tuple(range(ndim))
+    return signal, axes
+
+
+# The documented bound of the relative error (in the 2-norm) of the
+# results of transforms computed in single precision compared with those
+# computed in double precision, for signals of up to 2**20 samples.
+SINGLE_PRECISION_ERROR = 1e-6
+
+
+def precision(signal, dtype=None, kind=np.float32):
+    """Return the dtype of the results of a transform of the signal: of
+    the precision of dtype if given, else of the signal (at least
+    single precision), and at least of the kind (np.float32 for real
+    results or np.complex64 for complex ones). E.g. a float32 signal
+    gives complex64 Fourier coefficients and float64 gives complex128.
+    """
+    if dtype is None:
+        return np.result_type(signal, kind)
+    if np.iscomplexobj(signal):
+        kind = np.result_type(kind, np.complex64)
+    return np.result_type(np.finfo(dtype).dtype, kind)
+
+
+def cast(signal, dtype=None):
+    """Return the signal in the precision of dtype (keeping it real if
+    it is real), without copying it if it already is.
+    """
+    return signal.astype(precision(signal, dtype), copy=False)
+
+
+def apply(transform, signal, axis, out=None):
+    """Return the result of transform applied along the axis of the
+    signal. The transform acts along the last axis of the arrays it is
+    given and is called as transform(signal, out), where out is the
+    (moved) output array or None. The result is written into out if
+    given.
+    """
+    moved = np.moveaxis(signal, axis, -1)
+    if out is None:
+        return np.moveaxis(transform(moved, None), -1, axis)
+    moved_out = np.moveaxis(out, axis, -1)
+    result = transform(moved, moved_out)
+    if result is not moved_out:
+        moved_out[...] = result
+    return out
+
+
+def matmul(signal, matrix, axis, out=None):
+    """Return the matrix multiplied by each vector along the axis of the
+    signal. The result is written into out if given.
+    """
+    return apply(lambda x, o: np.matmul(x, matrix.T, out=o),
+                 signal, axis, out)
+
+
+# The size (in bytes) of the tiles of a signal that are transformed at
+# once by separable transforms.
+TILE_BYTES = 2**22
+
+
+def separable(transform, signal, axes, out=None, dtype=complex):
+    """Return the 2-dimensional separable transform of the signal along
+    its two axes: the 1-dimensional transform(x, axis) is applied along
+    the column axis and then the row axis, one tile of lines at a time,
+    with the results written into out (allocated with dtype if not
+    given). Beyond out, only about a tile of extra memory is used.
+    """
+    row_axis, col_axis = [axis % signal.ndim for axis in axes]
+    if out is None:
+        out = np.empty(signal.shape, dtype=dtype)
+    for axis, other, source in [(col_axis, row_axis, signal),
+                                (row_axis, col_axis, out)]:
+        size = max(out.nbytes // max(out.shape[other], 1), 1)
+        step = max(TILE_BYTES // size, 1)
+        for start in range(0, out.shape[other], step):
+            index = [slice(None)]*out.ndim
+            index[other] = slice(start, start + step)
+            index = tuple(index)
+            out[index] = transform(source[index], axis)
+    return out
@@ -0,0 +1,100 @@
+"""This module provides a bounded cache of basis matrices. Matrices are
+stored under a key of (family, size, dtype, direction) and the least
+recently used are evicted when the total size of the stored matrices
+exceeds the cache's budget (in bytes). Cached matrices are read-only so
+that they cannot be changed by accident by one of their users. The cache
+may be shared by threads.
+"""
+
+
+import collections
+import threading
+
+import numpy as np
+
+from .. import instrumentation
+
+
+class BasisCache:
+    """A least recently used cache of basis matrices bounded by a budget
+    of bytes.
+    """
+
+    def __init__(self, budget=256*2**20):
+        self.budget = budget
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._matrices = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, family, m, dtype, direction, build):
+        """Return the (read-only) matrix stored under the key (family, m,
+        dtype, direction). If there is none, build it by calling build()
+        and store it, evicting the least recently used matrices to stay
+        within budget. Matrices larger than the budget are not stored.
+        The matrix is built outside the cache's lock (build may itself
+        use the cache); if another thread stores the same key meanwhile,
+        its matrix is returned.
+        """
+        key = (family, m, np.dtype(dtype).name, direction)
+        with self._lock:
+            if key in self._matrices:
+                self.hits += 1
+                instrumentation.count('basis_cache_hits')
+                self._matrices.move_to_end(key)
+                return self._matrices[key]
+            self.misses += 1
+        instrumentation.count('basis_cache_misses')
+        matrix = np.asarray(build(), dtype=dtype)
+        instrumentation.count('basis_bytes', matrix.nbytes)
+        matrix.flags.writeable = False
+        with self._lock:
+            if key in self._matrices:
+                return self._matrices[key]
+            if matrix.nbytes <= self.budget:
+                self._matrices[key] = matrix
+                self.nbytes += matrix.nbytes
+                self._evict()
+        return matrix
+
+    def resize(self, budget):
+        """Change the budget (in bytes) of the cache, evicting matrices
+        if needed.
+        """
+        with self._lock:
+            self.budget = budget
+            self._evict()
+
+    def clear(self):
+        """Remove all the stored matrices and reset the counters."""
+        with self._lock:
+            self._matrices.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """Return a dictionary of the cache's counters and its size."""
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'entries': len(self._matrices),
+                    'nbytes': self.nbytes,
+                    'budget': self.budget}
+
+    def _evict(self):
+        """Remove the least recently used matrices until the stored
+        matrices are within budget. The cache's lock must be held.
+        """
+        while self.nbytes > self.budget:
+            _, matrix = self._matrices.popitem(last=False)
+            self.nbytes -= matrix.nbytes
+            self.evictions += 1
+            instrumentation.count('basis_cache_evictions')
+
+
+basis_cache = BasisCache()
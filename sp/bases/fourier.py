@@ -6,75 +6,606 @@ functional domain.
 
 import numpy as np
 
+from . import batch
+from . import plans
+from .cache import basis_cache
+from ..instrumentation import instrumented
 
-def idft(signal):
-    """Return the Fourier coefficients of a 1-dimensional signal."""
-    shape = signal.shape
-    if len(shape) != 1:
-        raise ValueError('Signal is not 1-dimensional.')
-    return ifourier_matrix(len(signal)).dot(signal)
 
+@instrumented
+def idft(signal, axis=None, out=None, dtype=None):
+    """Return the Fourier coefficients of a 1-dimensional signal, or of
+    every signal along the axis of an N-dimensional array. The
+    coefficients are written into out if given. They are computed in
+    the precision of dtype if given, else that of the signal (complex64
+    for float32 or complex64 signals, complex128 otherwise). Results in
+    single precision are within batch.SINGLE_PRECISION_ERROR (relative)
+    of those in double precision.
+    """
+    signal, axis = batch.check(signal, axis, 1)
+    dtype = batch.precision(signal, dtype, np.complex64)
+    matrix = ifourier_matrix(signal.shape[axis], dtype)
+    return batch.matmul(batch.cast(signal, dtype), matrix, axis, out)
 
-def dft(coefficients):
-    """Return the 1-dimensional signal from its Fourier coefficients."""
-    shape = coefficients.shape
-    if len(shape) != 1:
-        raise ValueError('Signal is not 1-dimensional.')
-    return fourier_matrix(len(coefficients)).dot(coefficients)
+
+@instrumented
+def dft(coefficients, axis=None, out=None, dtype=None):
+    """Return the 1-dimensional signal from its Fourier coefficients, or
+    every signal from the coefficients along the axis of an
+    N-dimensional array. The signal is written into out if given. See
+    idft for its precision.
+    """
+    coefficients, axis = batch.check(coefficients, axis, 1)
+    dtype = batch.precision(coefficients, dtype, np.complex64)
+    matrix = fourier_matrix(coefficients.shape[axis], dtype)
+    return batch.matmul(batch.cast(coefficients, dtype), matrix, axis, out)
 
 
-def fft(coefficients):
+@instrumented
+def fft(coefficients, axis=None, out=None, dtype=None):
     """Return the 1-dimensional signal from its Fourier coefficients
-    using the Fast Fourier Transform algorithm.
+    using the Fast Fourier Transform algorithm. See dft.
+    """
+    coefficients, axis = batch.check(coefficients, axis, 1)
+    dtype = batch.precision(coefficients, dtype, np.complex64)
+    inverse = plan(coefficients.shape[axis], dtype).inverse
+    return batch.apply(inverse, coefficients, axis, out)
+
+
+@instrumented
+def ifft(signal, axis=None, out=None, dtype=None):
+    """Return the Fourier coefficients of a 1-dimensional signal using
+    the Fast Fourier Transform algorithm. See idft.
     """
-    raise NotImplementedError()
+    signal, axis = batch.check(signal, axis, 1)
+    dtype = batch.precision(signal, dtype, np.complex64)
+    execute = plan(signal.shape[axis], dtype).execute
+    return batch.apply(execute, signal, axis, out)
+
 
+@instrumented
+def irfft(signal, axis=None, out=None, dtype=None):
+    """Return the non-redundant half (the first m//2 + 1) of the Fourier
+    coefficients of a real 1-dimensional signal of length m, or of every
+    signal along the axis of an N-dimensional array, using the Fast
+    Fourier Transform. The rest are the complex conjugates of these (in
+    reverse order). See idft.
+    """
+    signal, axis = batch.check(signal, axis, 1)
+    dtype = batch.precision(signal, dtype, np.complex64)
+    execute = rplan(signal.shape[axis], dtype).execute
+    return batch.apply(execute, signal, axis, out)
 
-def idft2(signal):
-    """Return the Fourier coefficients of a 2-dimensional signal."""
-    shape = signal.shape
-    if len(shape) != 2:
-        raise ValueError('Signal is not 2-dimensional.')
-    rows, cols = shape
-    return ifourier_matrix(rows).dot(signal.dot(ifourier_matrix(cols)))
 
+@instrumented
+def rfft(coefficients, m=None, axis=None, out=None, dtype=None):
+    """Return the real 1-dimensional signal of length m (2*(n - 1) if
+    not given) from the non-redundant half (n = m//2 + 1) of its Fourier
+    coefficients, or every signal from the coefficients along the axis
+    of an N-dimensional array, using the Fast Fourier Transform. This is
+    the inverse of irfft.
+    """
+    coefficients, axis = batch.check(coefficients, axis, 1)
+    dtype = batch.precision(coefficients, dtype, np.complex64)
+    m = m or 2*(coefficients.shape[axis] - 1)
+    inverse = rplan(m, dtype).inverse
+    return batch.apply(inverse, coefficients, axis, out)
 
-def dft2(coefficients):
-    """Return the 2-dimensional signal from its Fourier coefficients."""
-    shape = coefficients.shape
-    if len(shape) != 2:
-        raise ValueError('Signal is not 2-dimensional.')
-    rows, cols = shape
-    return fourier_matrix(rows).dot(coefficients.dot(fourier_matrix(cols)))
 
+@instrumented
+def irfft2(signal, axes=None, out=None, dtype=None):
+    """Return the non-redundant half of the Fourier coefficients (rows
+    by cols//2 + 1) of a real 2-dimensional signal, or of every
+    2-dimensional signal along the two axes of an N-dimensional array.
+    See irfft and idft2.
+    """
+    signal, (row_axis, col_axis) = batch.check(signal, axes, 2)
+    half = irfft(signal, col_axis, dtype=dtype)
+    return ifft(half, row_axis, out, half.dtype)
 
-def fourier_matrix(m):
+
+@instrumented
+def rfft2(coefficients, shape=None, axes=None, out=None, dtype=None):
+    """Return the real 2-dimensional signal of the shape (rows by
+    2*(n - 1) if not given) from the non-redundant half of its Fourier
+    coefficients (rows by n), or every signal from the coefficients
+    along the two axes of an N-dimensional array. This is the inverse of
+    irfft2.
+    """
+    coefficients, (row_axis, col_axis) = batch.check(coefficients, axes, 2)
+    half = fft(coefficients, row_axis, dtype=dtype)
+    cols = shape[1] if shape else None
+    return rfft(half, cols, col_axis, out, half.dtype)
+
+
+@instrumented
+def idft2(signal, axes=None, out=None, dtype=None):
+    """Return the Fourier coefficients of a 2-dimensional signal, or of
+    every 2-dimensional signal along the two axes of an N-dimensional
+    array. The rows and then the columns are transformed by the Fast
+    Fourier Transform a tile at a time, so no Fourier matrix is built
+    and little more memory than the coefficients is needed. The
+    coefficients are written into out if given. See idft for their
+    precision.
+    """
+    signal, axes = batch.check(signal, axes, 2)
+    dtype = batch.precision(signal, dtype, np.complex64)
+    return batch.separable(lambda x, axis: ifft(x, axis, dtype=dtype),
+                           signal, axes, out, dtype)
+
+
+@instrumented
+def dft2(coefficients, axes=None, out=None, dtype=None):
+    """Return the 2-dimensional signal from its Fourier coefficients, or
+    every 2-dimensional signal from the coefficients along the two axes
+    of an N-dimensional array, by the Fast Fourier Transform. See idft2.
+    """
+    coefficients, axes = batch.check(coefficients, axes, 2)
+    dtype = batch.precision(coefficients, dtype, np.complex64)
+    return batch.separable(lambda x, axis: fft(x, axis, dtype=dtype),
+                           coefficients, axes, out, dtype)
+
+
+@instrumented
+def stft(signal, m, hop=None, window=None, dtype=None):
+    """Return the short-time Fourier coefficients (frames by m) of a
+    1-dimensional signal: the Fourier coefficients of each frame of m
+    samples, multiplied by the window (rectangular if not given), with
+    consecutive frames starting hop samples apart (m//2 if not given).
+    See idft for their precision.
+    """
+    signal = np.asarray(signal)
+    if signal.ndim != 1:
+        raise ValueError('Signal is not 1-dimensional.')
+    dtype = batch.precision(signal, dtype, np.complex64)
+    signal = batch.cast(signal, dtype)
+    hop = hop or max(m // 2, 1)
+    window = np.ones(m) if window is None else np.asarray(window)
+    window = window.astype(signal.dtype)
+    count = (len(signal) - m)//hop + 1 if len(signal) >= m else 0
+    stride = signal.strides[0]
+    frames = np.lib.stride_tricks.as_strided(
+        signal, shape=(count, m), strides=(hop*stride, stride), writeable=False)
+    return plan(m, dtype).execute(frames*window)
+
+
+@instrumented
+def idft_bins(signal, bins, axis=None, dtype=None):
+    """Return the Fourier coefficients at the bins (indices, or
+    frequencies as in signals.sum_of_sinusoids) of a 1-dimensional
+    signal, or of every signal along the axis of an N-dimensional array.
+    Only the rows of the inverse Fourier matrix for the bins are built,
+    a block of _COLUMNS columns at a time, so k bins cost O(m*k) time
+    rather than the O(m**2) of idft and O(k*_COLUMNS) memory. See idft
+    for their precision.
+    """
+    signal, axis = batch.check(signal, axis, 1)
+    dtype = batch.precision(signal, dtype, np.complex64)
+    bins = np.asarray(bins, dtype=float)
+    return batch.apply(lambda x, o: _bins(batch.cast(x, dtype), bins, dtype),
+                       signal, axis)
+
+
+class SlidingDFT:
+    """The Fourier coefficients at a few bins of a window of the last m
+    samples of a stream. Each new sample updates each bin in O(1):
+    X <- (X - oldest)*exp(i*theta) + newest*exp(-i*theta*(m - 1)), where
+    theta = 2*pi*bin/m. The window is kept in a ring buffer, so only the
+    outgoing samples are read. The recurrence is applied a block of at
+    most BLOCK samples at a time, and the coefficients are recomputed
+    from the window every max(m, BLOCK) samples (O(1) per sample
+    amortised) so that rounding errors do not accumulate over a long
+    stream. The window initially holds zeros. The coefficients are
+    computed in the precision of dtype (double if not given), and the
+    window is promoted to complex if the samples are.
+    """
+
+    # The most samples whose coefficients are computed at once from the
+    # same starting coefficients.
+    BLOCK = 1024
+
+    def __init__(self, m, bins, dtype=None):
+        self.m = m
+        self.bins = np.asarray(bins, dtype=float)
+        self.norm = float(np.sqrt(m))
+        self.requested = dtype
+        self.reset()
+
+    def reset(self):
+        """Fill the window with zeros."""
+        self.window = np.zeros(self.m)
+        self.index = 0
+        self.elapsed = 0
+        self.coefficients = np.zeros(len(self.bins), dtype=complex)
+        self._configure(batch.precision(self.window, self.requested, np.complex64))
+
+    def update(self, samples):
+        """Add the samples to the stream and return the coefficients
+        (samples by bins) of the window ending at each of them.
+        """
+        samples = np.asarray(samples)
+        dtype = np.result_type(self.dtype,
+                               batch.precision(samples, self.requested, np.complex64))
+        if dtype != self.dtype:
+            self._configure(dtype)
+        if np.iscomplexobj(samples) and not np.iscomplexobj(self.window):
+            self.window = self.window.astype(self.dtype)
+        samples = samples.astype(self.window.dtype, copy=False)
+        if len(samples) <= self.BLOCK:
+            return self._update(samples)
+        coefficients = np.empty((len(samples), len(self.bins)), dtype=self.dtype)
+        for start in range(0, len(samples), self.BLOCK):
+            block = samples[start:start + self.BLOCK]
+            coefficients[start:start + len(block)] = self._update(block)
+        return coefficients
+
+    def _configure(self, dtype):
+        """Compute the stream in dtype: the rotations, the coefficients
+        and the window (in its real precision if it is real).
+        """
+        self.dtype = np.dtype(dtype)
+        theta = 2*np.pi*self.bins/self.m
+        self.rotation = np.exp(1j*theta).astype(self.dtype)
+        self.entry = np.exp(-1j*theta*(self.m - 1)).astype(self.dtype)
+        self.coefficients = self.coefficients.astype(self.dtype)
+        real = np.finfo(self.dtype).dtype
+        self.window = self.window.astype(
+            self.dtype if np.iscomplexobj(self.window) else real)
+
+    def _update(self, samples):
+        """Add a block of samples to the stream and return the
+        coefficients of the window ending at each of them.
+        """
+        n = len(samples)
+        if n == 0:
+            return np.zeros((0, len(self.bins)), dtype=self.dtype)
+        k = min(n, self.m)
+        # The ith sample replaces the one at (index + i) % m, the sample
+        # m before it (in the window for the first k, else in the block).
+        oldest = self.window.take(self.index + np.arange(k), mode='wrap')
+        if n > k:
+            oldest = np.concatenate([oldest, samples[:n - k]])
+        self.window.put(self.index + np.arange(n - k, n), samples[n - k:], mode='wrap')
+        self.index = (self.index + n) % self.m
+        steps = np.outer(samples, self.entry) - np.outer(oldest, self.rotation)
+        powers = (self.rotation**np.arange(1, n + 1)[:, None]).astype(self.dtype)
+        unscaled = self.coefficients*self.norm
+        coefficients = powers*(unscaled + np.cumsum(steps/powers, axis=0))
+        coefficients /= self.norm
+        self.elapsed += n
+        if self.elapsed >= max(self.m, self.BLOCK):
+            coefficients[-1] = self._exact()
+            self.elapsed = 0
+        self.coefficients = coefficients[-1]
+        return coefficients
+
+    def _exact(self):
+        """Return the coefficients computed directly from the window (see
+        idft_bins).
+        """
+        return _bins(np.roll(self.window, -self.index), self.bins, self.dtype)
+
+
+@instrumented
+def fourier_matrix(m, dtype=complex):
     """Return the orthonormal Fourier matrix (m by m). This matrix
     multiplies a vector of coefficients to construct a signal.
     """
-    k, j = np.meshgrid(np.arange(m), np.arange(m))
-    omega = np.exp(2*np.pi*1j/m)
-    return np.power(omega, k*j)/np.sqrt(m)
+    return basis_cache.get('Fourier', m, dtype, 'forward',
+                           lambda: _fourier_matrix(m, 1))
 
 
-def ifourier_matrix(m):
+@instrumented
+def ifourier_matrix(m, dtype=complex):
     """Return the inverse orthonormal Fourier matrix (m by m). This
     matrix multiplies a signal to obtain a vector of coefficients.
-    """    
+    """
+    return basis_cache.get('Fourier', m, dtype, 'inverse',
+                           lambda: _fourier_matrix(m, -1))
+
+
+def _fourier_matrix(m, sign):
+    """Return the orthonormal Fourier matrix (m by m) with exponent sign,
+    sign (1 or -1).
+    """
     k, j = np.meshgrid(np.arange(m), np.arange(m))
-    omega = np.exp(-2*np.pi*1j/m)
+    omega = np.exp(sign*2*np.pi*1j/m)
     return np.power(omega, k*j)/np.sqrt(m)
 
 
-def diagonal(m):
+@instrumented
+def diagonal(m, dtype=complex):
     """Return the diagonal matrix of the Fourier matrix."""
     j = np.arange(m)
     omega = np.exp(-2*np.pi*1j/m)
-    return np.diag(np.power(omega, j))
+    return np.diag(np.power(omega, j)).astype(dtype)
 
 
-def idiagonal(m):
+@instrumented
+def idiagonal(m, dtype=complex):
     """Return the diagonal matrix of the inverse Fourier matrix."""
     j = np.arange(m)
     omega = np.exp(2*np.pi*1j/m)
-    return np.diag(np.power(omega, j))
+    return np.diag(np.power(omega, j)).astype(dtype)
+
+
+# The largest transform computed directly by multiplication with its
+# (small) Fourier matrix rather than by being split further.
+_DIRECT_SIZE = 16
+
+# The most columns of the rows of the inverse Fourier matrix for a few
+# bins that are built at once.
+_COLUMNS = 1024
+
+
+def plan(m, dtype=complex):
+    """Return the (stored) plan of the Fast Fourier Transform of length
+    m in the precision of dtype. The plan is built the first time it is
+    asked for.
+    """
+    dtype = np.dtype(dtype)
+    return plans.get(('Fourier', m, dtype.name), lambda: FourierPlan(m, dtype))
+
+
+class FourierPlan:
+    """A plan of the Fast Fourier Transform of length m, computed in the
+    (complex) dtype. All the tables that depend only on m are computed
+    (in double precision) when the plan is made and stored in dtype.
+
+    The length m = p*q is split (mixed-radix Cooley-Tukey) into p
+    transforms of length q followed by q transforms of length p, each
+    with its own plan. Prime lengths are handled by Bluestein's
+    algorithm as a circular convolution of length 2**k >= 2m - 1. Short
+    lengths are multiplied directly by their Fourier matrix.
+    """
+
+    def __init__(self, m, dtype=complex):
+        self.m = m
+        self.dtype = np.dtype(dtype)
+        self.norm = float(np.sqrt(m))
+        self.matrix = None
+        self.twiddles = None
+        self.chirp = None
+        self.kernel = None
+        self.subplans = ()
+        if m <= _DIRECT_SIZE:
+            self.matrix = _dft_matrix(m, -1).astype(self.dtype)
+            return
+        p = _radix(m)
+        if p == m:
+            size = 2**int(np.ceil(np.log2(2*m - 1)))
+            self.chirp = _chirp(m, -1).astype(self.dtype)
+            self.subplans = (plan(size, self.dtype),)
+            kernel = np.zeros(size, dtype=self.dtype)
+            kernel[:m] = self.chirp.conj()
+            kernel[size-m+1:] = self.chirp[:0:-1].conj()
+            self.kernel = self.subplans[0].transform(kernel)
+        else:
+            self.twiddles = _twiddles(p, m // p, -1).astype(self.dtype)
+            self.subplans = (plan(m // p, self.dtype), plan(p, self.dtype))
+
+    def execute(self, signal, out=None):
+        """Return the Fourier coefficients of the signal (along its last
+        axis), written into out if given.
+        """
+        result = self.transform(self._check(signal), out)
+        result /= self.norm
+        return result
+
+    def inverse(self, coefficients, out=None):
+        """Return the signal (along the last axis) from its Fourier
+        coefficients, written into out if given.
+        """
+        coefficients = self._check(coefficients)
+        result = self.transform(coefficients.conj(), out)
+        np.conjugate(result, out=result)
+        result /= self.norm
+        return result
+
+    def transform(self, x, out=None):
+        """Return the unnormalised discrete Fourier transform of x along
+        its last axis, written into out if given. The last stage writes
+        straight into out if it is contiguous and of the plan's dtype.
+        """
+        x = np.asarray(x, dtype=self.dtype)
+        if self.matrix is not None:
+            return np.matmul(x, self.matrix, out=out)
+        target = out
+        if out is None or out.dtype != self.dtype or not out.flags.c_contiguous:
+            target = np.empty(x.shape, dtype=self.dtype)
+        if self.chirp is not None:
+            size = self.subplans[0].m
+            padded = np.zeros(x.shape[:-1] + (size,), dtype=self.dtype)
+            padded[..., :self.m] = x*self.chirp
+            spectrum = self.subplans[0].transform(padded)*self.kernel
+            convolved = self.subplans[0].transform(spectrum.conj()).conj()
+            np.multiply(self.chirp, convolved[..., :self.m], out=target)
+            target /= size
+        else:
+            p, q = self.twiddles.shape
+            inner, outer = self.subplans
+            y = inner.transform(x.reshape(x.shape[:-1] + (q, p)).swapaxes(-1, -2))
+            y *= self.twiddles
+            outer.transform(y.swapaxes(-1, -2),
+                            target.reshape(x.shape[:-1] + (p, q)).swapaxes(-1, -2))
+        if out is not None and target is not out:
+            out[...] = target
+            return out
+        return target
+
+    def _check(self, x):
+        """Return x as an array if its last axis is of the plan's length.
+        Else raise a ValueError.
+        """
+        x = np.asarray(x)
+        if x.ndim == 0 or x.shape[-1] != self.m:
+            raise ValueError('Signal is not of length {}.'.format(self.m))
+        return x
+
+
+def rplan(m, dtype=complex):
+    """Return the (stored) plan of the Fast Fourier Transform of real
+    signals of length m in the precision of dtype.
+    """
+    dtype = np.dtype(dtype)
+    return plans.get(('RealFourier', m, dtype.name),
+                     lambda: RealFourierPlan(m, dtype))
+
+
+class RealFourierPlan:
+    """A plan of the Fast Fourier Transform of real signals of length m,
+    computed in the (complex) dtype, which gives only the non-redundant
+    half of the coefficients. For even m, the even and odd samples are
+    packed into the real and imaginary parts of a complex signal of
+    length m/2, whose transform is split back into the two halves'
+    transforms and combined with twiddle factors, in place. Odd lengths
+    use the complex transform.
+    """
+
+    def __init__(self, m, dtype=complex):
+        self.m = m
+        self.dtype = np.dtype(dtype)
+        self.real = np.finfo(self.dtype).dtype
+        self.norm = float(np.sqrt(m))
+        if m % 2:
+            self.subplan = plan(m, self.dtype)
+            self.twiddles = None
+        else:
+            self.subplan = plan(m // 2, self.dtype)
+            k = np.arange(m // 2 + 1)
+            twiddles = np.exp(-2j*np.pi*k/m)
+            self.twiddles = twiddles.astype(self.dtype)
+            # The weights of the packed transform and of its reflection
+            # (conjugated) in the coefficients, and of the coefficients
+            # and their reflection in the packed signal to invert them.
+            self.weights = ((1 - 1j*twiddles)/(2*self.norm)).astype(self.dtype)
+            self.reflected = ((1 + 1j*twiddles)/(2*self.norm)).astype(self.dtype)
+            scale = self.norm/m
+            self.inverse_weights = ((1 + 1j*twiddles[:-1].conj())*scale).astype(self.dtype)
+            self.inverse_reflected = ((1 - 1j*twiddles[:-1].conj())*scale).astype(self.dtype)
+
+    def execute(self, signal, out=None):
+        """Return the non-redundant half of the Fourier coefficients of
+        the real signal (along its last axis), written into out if given.
+        """
+        signal = np.asarray(signal)
+        if signal.ndim == 0 or signal.shape[-1] != self.m:
+            raise ValueError('Signal is not of length {}.'.format(self.m))
+        half = self.m // 2
+        if self.twiddles is None:
+            return np.divide(self.subplan.transform(signal)[..., :half + 1],
+                             self.norm, out=out)
+        packed = np.ascontiguousarray(signal, dtype=self.real).view(self.dtype)
+        z = self.subplan.transform(packed)
+        shape = z.shape[:-1] + (half + 1,)
+        result = out
+        if out is None or out.dtype != self.dtype:
+            result = np.empty(shape, dtype=self.dtype)
+        result[..., :half] = z
+        result[..., half:] = z[..., :1]
+        reflected = np.empty(shape, dtype=self.dtype)
+        reflected[..., :1] = z[..., :1]
+        reflected[..., 1:half] = z[..., :0:-1]
+        reflected[..., half:] = z[..., :1]
+        np.conjugate(reflected, out=reflected)
+        result *= self.weights
+        reflected *= self.reflected
+        result += reflected
+        if out is not None and result is not out:
+            out[...] = result
+            return out
+        return result
+
+    def inverse(self, coefficients, out=None):
+        """Return the real signal (along the last axis) from the
+        non-redundant half of its Fourier coefficients, written into out
+        if given.
+        """
+        coefficients = np.asarray(coefficients, dtype=self.dtype)
+        half = self.m // 2
+        if coefficients.ndim == 0 or coefficients.shape[-1] != half + 1:
+            raise ValueError('Coefficients are not of length {}.'.format(half + 1))
+        if self.twiddles is None:
+            full = np.concatenate(
+                [coefficients, coefficients[..., half:0:-1].conj()], axis=-1)
+            real = self.subplan.inverse(full).real
+            if out is None:
+                return real.astype(self.real)
+            out[...] = real
+            return out
+        x = np.multiply(coefficients[..., :half], self.inverse_weights)
+        reflected = np.conjugate(coefficients[..., half:0:-1])
+        reflected *= self.inverse_reflected
+        x += reflected
+        np.conjugate(x, out=x)
+        packed = None
+        if out is not None and out.dtype == self.real and out.flags.c_contiguous:
+            packed = out.view(self.dtype)
+        z = self.subplan.transform(x, packed)
+        np.conjugate(z, out=z)
+        if packed is not None:
+            return out
+        if out is not None:
+            out[...] = z.view(self.real)
+            return out
+        return z.view(self.real)
+
+
+def _bins(signal, bins, dtype):
+    """Return the Fourier coefficients at the bins of the signal (along
+    its last axis) in dtype, summed over blocks of _COLUMNS columns of
+    the rows of the inverse Fourier matrix for the bins.
+    """
+    m = signal.shape[-1]
+    total = np.zeros(signal.shape[:-1] + (len(bins),), dtype=dtype)
+    for start in range(0, m, _COLUMNS):
+        j = np.arange(start, min(start + _COLUMNS, m))
+        rows = np.exp(-2j*np.pi*(np.outer(bins, j) % m)/m).astype(dtype)
+        total += np.matmul(signal[..., start:start + len(j)], rows.T)
+    total /= dtype.type(np.sqrt(m))
+    return total
+
+
+def _radix(m):
+    """Return the factor of m by which a transform of length m is split.
+    This is the product of the smallest prime factors of m that does not
+    exceed the direct transform size, or m itself if m is prime.
+    """
+    p = _smallest_factor(m)
+    if p == m:
+        return m
+    while m // p > 1 and p*_smallest_factor(m // p) <= _DIRECT_SIZE:
+        p *= _smallest_factor(m // p)
+    return p
+
+
+def _smallest_factor(m):
+    """Return the smallest prime factor of m (m itself if m is prime)."""
+    for i in range(2, int(np.sqrt(m)) + 1):
+        if m % i == 0:
+            return i
+    return m
+
+
+def _dft_matrix(m, sign):
+    """Return the unnormalised (symmetric) Fourier matrix (m by m) with
+    exponent sign, sign (1 or -1).
+    """
+    j = np.arange(m)
+    return np.exp(sign*2j*np.pi*(np.outer(j, j) % m)/m)
+
+
+def _twiddles(p, q, sign):
+    """Return the twiddle factors (p by q) that combine the p transforms
+    of length q into a transform of length p*q.
+    """
+    j, k = np.arange(p), np.arange(q)
+    return np.exp(sign*2j*np.pi*np.outer(j, k)/(p*q))
+
+
+def _chirp(m, sign):
+    """Return the chirp exp(sign*i*pi*n**2/m) (n < m) used by Bluestein's
+    algorithm.
+    """
+    n = np.arange(m)
+    return np.exp(sign*1j*np.pi*((n*n) % (2*m))/m)
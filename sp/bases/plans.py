@@ -0,0 +1,54 @@
+"""This module provides the storage of transform plans. A plan holds
+everything about a transform that depends only on its size (twiddle
+factors, permutations, basis matrices) so that it is computed once and
+reused. The stored plans ('wisdom') can be saved to and loaded from disk
+so that a process can be warmed up without computing them again. The
+stored plans may be shared by threads.
+"""
+
+
+import pickle
+import threading
+
+
+_wisdom = {}
+_lock = threading.Lock()
+
+
+def get(key, build):
+    """Return the plan stored under key. If there is none, build it by
+    calling build() and store it first. The plan is built outside the
+    lock (a plan may build its subplans); if another thread stores the
+    same key meanwhile, its plan is returned.
+    """
+    with _lock:
+        if key in _wisdom:
+            return _wisdom[key]
+    plan = build()
+    with _lock:
+        return _wisdom.setdefault(key, plan)
+
+
+def save_wisdom(filename):
+    """Save all the stored plans to the file, filename."""
+    with _lock:
+        wisdom = dict(_wisdom)
+    with open(filename, 'wb') as f:
+        pickle.dump(wisdom, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_wisdom(filename):
+    """Load the plans saved in the file, filename, and add them to the
+    stored plans. Only load files from trusted sources as the plans are
+    unpickled.
+    """
+    with open(filename, 'rb') as f:
+        wisdom = pickle.load(f)
+    with _lock:
+        _wisdom.update(wisdom)
+
+
+def forget_wisdom():
+    """Remove all the stored plans."""
+    with _lock:
+        _wisdom.clear()
@@ -1 +1,32 @@
-from .transforms import *
\ No newline at end of file
+"""This package provides the wavelet transforms and families. The
+families register themselves (through the Wavelets metaclass) when the
+transforms are first used, rather than when sp is imported.
+"""
+
+
+import importlib
+
+
+_submodules = ('families', 'transforms')
+
+
+def __getattr__(name):
+    """Import and return the submodule, or the public name of the
+    transforms module (as if star-imported), on first access.
+    """
+    if name in _submodules:
+        return importlib.import_module('.' + name, __name__)
+    if name.startswith('_'):
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    transforms = importlib.import_module('.transforms', __name__)
+    globals().update((key, value) for key, value in vars(transforms).items()
+                     if not key.startswith('_'))
+    if name not in globals():
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    return globals()[name]
+
+
+def __dir__():
+    transforms = importlib.import_module('.transforms', __name__)
+    return sorted(set(globals()) | set(_submodules) |
+                  {key for key in vars(transforms) if not key.startswith('_')})
@@ -5,16 +5,23 @@ wavelets.
 
 import numpy as np
 
+from .. import batch
+from ..cache import basis_cache
+from .filters import daubechies, symlet, quadrature_mirror
+from ...instrumentation import instrumented
+
 
 class Wavelets(type):
     """A metaclass to encapsulate all the families of wavelets."""
     
     families = {}
     def __init__(cls, name, bases, attrs):
-        """Upon this metaclass being used, add the new class' name and
-        the class itself to the metaclass variable 'families'.
+        """Upon this metaclass being used, add the new class' name (or
+        the name it declares) and the class itself to the metaclass
+        variable 'families', unless the class declares itself abstract.
         """
-        Wavelets.families[name] = cls
+        if not attrs.get('abstract', False):
+            Wavelets.families[attrs.get('name', name)] = cls
 
 
 class Haar(metaclass=Wavelets):
@@ -40,13 +47,20 @@ class Haar(metaclass=Wavelets):
             return (1/np.sqrt(k))*np.append(s, np.zeros(m - k))
 
     @staticmethod
-    def matrix(m):
+    @instrumented
+    def matrix(m, dtype=float):
         """Return the orthonormal Haar wavelet matrix (m by m) where
         log2(m) is a real number. This matrix multiplies a vector of
         coefficients to construct a signal.
         """
         if not np.log2(m).is_integer():
             raise ValueError("The value of log2(m) must be a whole number.")
+        return basis_cache.get('Haar', m, dtype, 'forward',
+                               lambda: Haar._matrix(m))
+
+    @staticmethod
+    def _matrix(m):
+        """Build the orthonormal Haar wavelet matrix (m by m)."""
         vectors = []
         for i in map(lambda x: 2**x, reversed(range(int(np.log2(2*m))))):
             wavelet = Haar.wavelet(i, m)
@@ -60,14 +74,119 @@ class Haar(metaclass=Wavelets):
         return np.column_stack(vectors)
 
     @staticmethod
-    def imatrix(m):
+    @instrumented
+    def imatrix(m, dtype=float):
         """Return the inverse orthonormal Haar wavelet matrix (m by m)
         where log2(m) is a real number. This matrix multiplies a signal
         to obtain a vector of coefficients a signal.
         """
-        return Haar.matrix(m).T
+        return basis_cache.get(
+            'Haar', m, dtype, 'inverse',
+            lambda: np.ascontiguousarray(Haar.matrix(m, dtype).T))
+
+    @staticmethod
+    @instrumented
+    def ilift(signal, levels=None, out=None, dtype=None):
+        """Return the Haar wavelet coefficients of a signal (along its
+        last axis) by lifting: each level replaces the approximation
+        with the normalised pairwise sums followed by the pairwise
+        differences, in O(m). The coefficients are in the same order as
+        those from Haar.imatrix. A partial decomposition of 'levels'
+        levels only needs m to be divisible by 2**levels. The result is
+        written into out if given (which may be the signal itself), else
+        computed in the precision of dtype if given or else of the signal
+        (at least single precision).
+        """
+        signal = np.asarray(signal)
+        m = signal.shape[-1]
+        levels = Haar._levels(m, levels)
+        if out is None:
+            out = np.array(signal, dtype=batch.precision(signal, dtype))
+        elif out is not signal:
+            out[...] = signal
+        root2 = out.dtype.type(np.sqrt(2))
+        n = m
+        for _ in range(levels):
+            even, odd = out[..., 0:n:2], out[..., 1:n:2]
+            approximation = (even + odd)/root2
+            detail = (even - odd)/root2
+            out[..., :n//2] = approximation
+            out[..., n//2:n] = detail
+            n //= 2
+        return out
+
+    @staticmethod
+    @instrumented
+    def lift(coefficients, levels=None, out=None, dtype=None):
+        """Return the signal (along the last axis) from its Haar wavelet
+        coefficients by lifting, in O(m). This is the inverse of
+        Haar.ilift for the same number of levels. The result is written
+        into out if given (which may be the coefficients themselves). See
+        Haar.ilift for its precision.
+        """
+        coefficients = np.asarray(coefficients)
+        m = coefficients.shape[-1]
+        levels = Haar._levels(m, levels)
+        if out is None:
+            out = np.array(coefficients,
+                           dtype=batch.precision(coefficients, dtype))
+        elif out is not coefficients:
+            out[...] = coefficients
+        root2 = out.dtype.type(np.sqrt(2))
+        n = m >> levels
+        for _ in range(levels):
+            approximation, detail = out[..., :n], out[..., n:2*n]
+            even = (approximation + detail)/root2
+            odd = (approximation - detail)/root2
+            out[..., 0:2*n:2] = even
+            out[..., 1:2*n:2] = odd
+            n *= 2
+        return out
+
+    @staticmethod
+    def _levels(m, levels):
+        """Return the number of levels of a decomposition of a signal of
+        length m: all of them (log2(m), which must be a whole number) if
+        levels is None. Else raise a ValueError if m is not divisible by
+        2**levels.
+        """
+        if levels is None:
+            if not np.log2(m).is_integer():
+                raise ValueError("The value of log2(m) must be a whole number.")
+            return int(np.log2(m))
+        if levels < 0 or m % 2**levels != 0:
+            raise ValueError("The value of m must be divisible by 2**levels.")
+        return levels
+
+    @staticmethod
+    @instrumented
+    def scalogram(coefficients):
+        """Return the amplitudes of the Haar wavelets of each dilation
+        across the length of the signal (m by log2(m) + 1), or of every
+        signal, from its coefficients (along the last axis). This is the
+        squeezed wavelet matrix scaled by the coefficients, but each
+        dilation is expanded from its coefficients by broadcasting,
+        without building the (m by m) matrix.
+        """
+        coefficients = np.asarray(coefficients)
+        m = coefficients.shape[-1]
+        levels = Haar._levels(m, None)
+        dtype = coefficients.dtype if coefficients.dtype.kind in 'fc' else np.dtype(float)
+        real = np.finfo(dtype).dtype
+        out = np.empty(coefficients.shape[:-1] + (m, levels + 1), dtype)
+        out[..., 0] = coefficients[..., :1]*real.type(1/np.sqrt(m))
+        for j in range(1, levels + 1):
+            k = m >> (j - 1)
+            w = 1/np.sqrt(k)
+            wavelet = np.repeat(np.array([w, -w], dtype=real), k//2)
+            details = coefficients[..., 2**(j - 1):2**j, np.newaxis]*wavelet
+            out[..., j] = details.reshape(coefficients.shape[:-1] + (m,))
+        # Adding zero turns -0.0 into 0.0, as the sums of squeeze do.
+        out += 0
+        return out
 
     @staticmethod
+    @instrumented
     def squeeze(matrix):
         """Return a squeezed version of the wavelet imatrix (so that
         the number of columns equals the number of dilations of the Haar
@@ -82,4 +201,322 @@ class Haar(metaclass=Wavelets):
                 vectors.append(accum)
                 accum = np.zeros(length)
         return np.column_stack(vectors)
-        
\ No newline at end of file
+
+
+# The ways a signal is extended beyond its ends by a filter bank. The
+# periodic mode keeps m coefficients (for m divisible by 2**levels); the
+# others keep (n + filter_len - 1)//2 of each band at each level, enough
+# to reconstruct the signal of length n exactly.
+MODES = ('periodic', 'symmetric', 'zero')
+
+
+class FilterBank(metaclass=Wavelets):
+    """An abstract family of orthogonal wavelets transformed by a filter
+    bank. A family declares only its low-pass (scaling) and high-pass
+    (wavelet) synthesis filters, lowpass and highpass. Each level
+    correlates the approximation with both filters and keeps every
+    other result, in O(m*filter_len). The coefficients are in the same
+    order as those of Haar: [a_L, d_L, ..., d_1].
+    """
+
+    abstract = True
+    lowpass = None
+    highpass = None
+
+    @classmethod
+    @instrumented
+    def ifilter(cls, signal, levels=None, mode='periodic', out=None, dtype=None):
+        """Return the wavelet coefficients of a signal (along its last
+        axis) of levels levels (by default, as many as the length and
+        mode allow; see FilterBank.levels), with the signal extended by
+        the boundary mode. The coefficients are written into out if
+        given. They are computed in the precision of dtype if given,
+        else of the signal (at least single precision).
+        """
+        signal = np.asarray(signal)
+        levels = cls.levels(signal.shape[-1], levels, mode)
+        approximation = batch.cast(signal, dtype)
+        lowpass, highpass = cls._filters(approximation.dtype)
+        bands = []
+        for _ in range(levels):
+            n = approximation.shape[-1]
+            if mode == 'periodic':
+                extended = cls._extend(approximation, 0, len(lowpass) - 1, 'wrap')
+                start, count = 0, n//2
+            else:
+                extended = cls._extend(approximation, len(lowpass) - 1,
+                                       len(lowpass) - 1, mode)
+                start, count = 1, (n + len(lowpass) - 1)//2
+            approximation, detail = 0, 0
+            for j in range(len(lowpass)):
+                taps = extended[..., start + j:start + j + 2*count - 1:2]
+                approximation = approximation + lowpass[j]*taps
+                detail = detail + highpass[j]*taps
+            bands.append(detail)
+        bands.append(approximation)
+        return np.concatenate(bands[::-1], axis=-1, out=out)
+
+    @classmethod
+    @instrumented
+    def filter(cls, coefficients, m=None, levels=None, mode='periodic', out=None,
+               dtype=None):
+        """Return the signal of length m (along the last axis) from its
+        wavelet coefficients of levels levels, extended by the boundary
+        mode, written into out if given. This is the inverse of
+        FilterBank.ifilter. For the periodic mode m is the number of
+        coefficients; for the others it must be given. See
+        FilterBank.ifilter for its precision.
+        """
+        coefficients = batch.cast(np.asarray(coefficients), dtype)
+        if m is None:
+            if mode != 'periodic':
+                raise ValueError('The signal length m must be given for the {} mode.'.format(mode))
+            m = coefficients.shape[-1]
+        levels = cls.levels(m, levels, mode)
+        lengths = cls.lengths(m, levels, mode)
+        if coefficients.shape[-1] != sum(lengths):
+            raise ValueError('Coefficients are not of length {}.'.format(sum(lengths)))
+        lowpass, highpass = cls._filters(coefficients.dtype)
+        taps = len(lowpass)
+        sizes = [m]
+        for _ in range(levels):
+            sizes.append(sizes[-1]//2 if mode == 'periodic'
+                         else (sizes[-1] + taps - 1)//2)
+        approximation = coefficients[..., :lengths[0]]
+        start = lengths[0]
+        for n, count in zip(sizes[-2::-1], lengths[1:]):
+            detail = coefficients[..., start:start + count]
+            start += count
+            full = np.zeros(coefficients.shape[:-1] + (2*count + taps,),
+                            dtype=coefficients.dtype)
+            for j in range(taps):
+                full[..., j:j + 2*count:2] += lowpass[j]*approximation + highpass[j]*detail
+            if mode == 'periodic':
+                approximation = full[..., :n].copy()
+                for fold in range(n, full.shape[-1], n):
+                    wrapped = full[..., fold:fold + n]
+                    approximation[..., :wrapped.shape[-1]] += wrapped
+            else:
+                approximation = full[..., taps - 2:taps - 2 + n]
+        if out is not None:
+            out[...] = approximation
+            return out
+        return np.ascontiguousarray(approximation)
+
+    @classmethod
+    def levels(cls, m, levels=None, mode='periodic'):
+        """Return the number of levels of a decomposition of a signal of
+        length m. By default, the periodic mode decomposes for as long as
+        the approximation is of even length and the others for as long
+        as it is no shorter than the filters. Raise a ValueError if the
+        periodic mode is given a length m not divisible by 2**levels (by
+        default, an odd length m > 1, of which no level is possible), or
+        a NotImplementedError if the mode is not implemented.
+        """
+        if mode not in MODES:
+            raise NotImplementedError('{} mode is not implemented.'.format(mode))
+        if levels is None:
+            if mode == 'periodic':
+                if m > 1 and m % 2:
+                    raise ValueError("The value of m must be even for the periodic mode.")
+                return (m & -m).bit_length() - 1 if m else 0
+            return max(int(np.log2(max(m, 1)/(len(cls.lowpass) - 1))), 0)
+        if levels < 0 or (mode == 'periodic' and m % 2**levels != 0):
+            raise ValueError("The value of m must be divisible by 2**levels.")
+        return levels
+
+    @classmethod
+    def lengths(cls, m, levels=None, mode='periodic'):
+        """Return the lengths of the bands of the coefficients of a
+        signal of length m: [a_L, d_L, ..., d_1].
+        """
+        levels = cls.levels(m, levels, mode)
+        lengths = []
+        for _ in range(levels):
+            m = m//2 if mode == 'periodic' else (m + len(cls.lowpass) - 1)//2
+            lengths.append(m)
+        return [m] + lengths[::-1]
+
+    @classmethod
+    @instrumented
+    def matrix(cls, m, dtype=float):
+        """Return the orthonormal wavelet matrix (m by m) of the periodic
+        mode. This matrix multiplies a vector of coefficients to
+        construct a signal.
+        """
+        return basis_cache.get(cls.name, m, dtype, 'forward',
+                               lambda: cls.filter(np.eye(m)).T)
+
+    @classmethod
+    @instrumented
+    def imatrix(cls, m, dtype=float):
+        """Return the inverse orthonormal wavelet matrix (m by m) of the
+        periodic mode. This matrix multiplies a signal to obtain a vector
+        of coefficients.
+        """
+        return basis_cache.get(
+            cls.name, m, dtype, 'inverse',
+            lambda: np.ascontiguousarray(cls.matrix(m, dtype).T))
+
+    @classmethod
+    @instrumented
+    def scalogram(cls, coefficients):
+        """Return the amplitudes of the wavelets of each dilation across
+        the length of the signal (m by levels + 1), or of every signal,
+        from its coefficients (along the last axis) of the periodic mode:
+        each band reconstructed on its own, in O(m*filter_len*levels).
+        """
+        coefficients = np.asarray(coefficients)
+        m = coefficients.shape[-1]
+        lengths = cls.lengths(m)
+        bands = np.split(np.arange(m), np.cumsum(lengths)[:-1])
+        amplitudes = []
+        for band in bands:
+            single = np.zeros_like(coefficients)
+            single[..., band] = coefficients[..., band]
+            amplitudes.append(cls.filter(single))
+        return np.stack(amplitudes, axis=-1)
+
+    @classmethod
+    def _filters(cls, dtype):
+        """Return the low-pass and high-pass filters in the real
+        precision of dtype.
+        """
+        real = np.finfo(dtype).dtype
+        return (np.asarray(cls.lowpass, dtype=real),
+                np.asarray(cls.highpass, dtype=real))
+
+    @staticmethod
+    def _extend(signal, before, after, mode):
+        """Return the signal (along its last axis) extended by before
+        and after samples in the mode: 'wrap' (periodic), 'symmetric'
+        (mirrored, repeating the end samples) or 'zero'.
+        """
+        width = [(0, 0)]*(signal.ndim - 1) + [(before, after)]
+        return np.pad(signal, width, mode='constant' if mode == 'zero' else mode)
+
+
+class Daubechies2(FilterBank):
+    """The Daubechies family of wavelets with 2 vanishing moments."""
+    name = 'db2'
+    lowpass = daubechies(2)
+    highpass = quadrature_mirror(lowpass)
+
+
+class Daubechies3(FilterBank):
+    """The Daubechies family of wavelets with 3 vanishing moments."""
+    name = 'db3'
+    lowpass = daubechies(3)
+    highpass = quadrature_mirror(lowpass)
+
+
+class Daubechies4(FilterBank):
+    """The Daubechies family of wavelets with 4 vanishing moments."""
+    name = 'db4'
+    lowpass = daubechies(4)
+    highpass = quadrature_mirror(lowpass)
+
+
+class Daubechies5(FilterBank):
+    """The Daubechies family of wavelets with 5 vanishing moments."""
+    name = 'db5'
+    lowpass = daubechies(5)
+    highpass = quadrature_mirror(lowpass)
+
+
+class Daubechies6(FilterBank):
+    """The Daubechies family of wavelets with 6 vanishing moments."""
+    name = 'db6'
+    lowpass = daubechies(6)
+    highpass = quadrature_mirror(lowpass)
+
+
+class Daubechies7(FilterBank):
+    """The Daubechies family of wavelets with 7 vanishing moments."""
+    name = 'db7'
+    lowpass = daubechies(7)
+    highpass = quadrature_mirror(lowpass)
+
+
+class Daubechies8(FilterBank):
+    """The Daubechies family of wavelets with 8 vanishing moments."""
+    name = 'db8'
+    lowpass = daubechies(8)
+    highpass = quadrature_mirror(lowpass)
+
+
+class Daubechies9(FilterBank):
+    """The Daubechies family of wavelets with 9 vanishing moments."""
+    name = 'db9'
+    lowpass = daubechies(9)
+    highpass = quadrature_mirror(lowpass)
+
+
+class Daubechies10(FilterBank):
+    """The Daubechies family of wavelets with 10 vanishing moments."""
+    name = 'db10'
+    lowpass = daubechies(10)
+    highpass = quadrature_mirror(lowpass)
+
+
+class Symlet2(FilterBank):
+    """The symlet family of wavelets with 2 vanishing moments."""
+    name = 'sym2'
+    lowpass = symlet(2)
+    highpass = quadrature_mirror(lowpass)
+
+
+class Symlet3(FilterBank):
+    """The symlet family of wavelets with 3 vanishing moments."""
+    name = 'sym3'
+    lowpass = symlet(3)
+    highpass = quadrature_mirror(lowpass)
+
+
+class Symlet4(FilterBank):
+    """The symlet family of wavelets with 4 vanishing moments."""
+    name = 'sym4'
+    lowpass = symlet(4)
+    highpass = quadrature_mirror(lowpass)
+
+
+class Symlet5(FilterBank):
+    """The symlet family of wavelets with 5 vanishing moments."""
+    name = 'sym5'
+    lowpass = symlet(5)
+    highpass = quadrature_mirror(lowpass)
+
+
+class Symlet6(FilterBank):
+    """The symlet family of wavelets with 6 vanishing moments."""
+    name = 'sym6'
+    lowpass = symlet(6)
+    highpass = quadrature_mirror(lowpass)
+
+
+class Symlet7(FilterBank):
+    """The symlet family of wavelets with 7 vanishing moments."""
+    name = 'sym7'
+    lowpass = symlet(7)
+    highpass = quadrature_mirror(lowpass)
+
+
+class Symlet8(FilterBank):
+    """The symlet family of wavelets with 8 vanishing moments."""
+    name = 'sym8'
+    lowpass = symlet(8)
+    highpass = quadrature_mirror(lowpass)
+
+
+class Symlet9(FilterBank):
+    """The symlet family of wavelets with 9 vanishing moments."""
+    name = 'sym9'
+    lowpass = symlet(9)
+    highpass = quadrature_mirror(lowpass)
+
+
+class Symlet10(FilterBank):
+    """The symlet family of wavelets with 10 vanishing moments."""
+    name = 'sym10'
+    lowpass = symlet(10)
+    highpass = quadrature_mirror(lowpass)
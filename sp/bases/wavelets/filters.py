@@ -0,0 +1,107 @@
+"""This module provides the design of the filters of orthogonal
+wavelets: the Daubechies wavelets by spectral factorisation, and the
+symlets from their published tables.
+"""
+
+
+import math
+
+import numpy as np
+
+
+# The low-pass (scaling) synthesis filters of the symlets with 2 to 10
+# vanishing moments, as published (e.g. in PyWavelets as rec_lo): the
+# spectral factor and orientation of each chosen in the tables, which no
+# single phase criterion reproduces for every n. Each is the exact
+# factor, computed in double precision.
+SYMLETS = {
+    2: [0.48296291314453427, 0.836516303737808, 0.2241438680420133,
+        -0.12940952255126045],
+    3: [0.3326705529500826, 0.8068915093110924, 0.4598775021184915,
+        -0.1350110200102546, -0.08544127388202663, 0.03522629188570956],
+    4: [0.03222310060405141, -0.01260396726203137, -0.0992195435766333,
+        0.2978577956053064, 0.803738751805132, 0.4976186676327748,
+        -0.02963552764600261, -0.07576571478950221],
+    5: [0.02733306834499875, 0.029519490925706236, -0.039134249302313795,
+        0.1993975339768559, 0.7234076904040411, 0.6339789634567918,
+        0.016602105764510506, -0.17532808990805626, -0.021101834024689025,
+        0.019538882735249848],
+    6: [-0.0078007083250323786, 0.0017677118642539832, 0.04472490177078131,
+        -0.02106029251237068, -0.07263752278637649, 0.3379294217281658,
+        0.7876411410286506, 0.4910559419279736, -0.04831174258569752,
+        -0.1179901111485199, 0.0034907120842221605, 0.015404109327044798],
+    7: [0.002681814568260152, -0.0010473848886797383, -0.012636303403240593,
+        0.030515513165877892, 0.06789269350122057, -0.04955283493704289,
+        0.01744125508683521, 0.5361019170905691, 0.767764317004883,
+        0.28862963175064854, -0.14004724044293357, -0.1078082377032898,
+        0.00401024487152237, 0.010268176708464815],
+    8: [0.0018899503327676848, -0.0003029205147241392, -0.014952258337062178,
+        0.0038087520138944905, 0.04913717967373027, -0.027219029917103236,
+        -0.051945838107881476, 0.364441894836179, 0.7771857516996282,
+        0.48135965125905195, -0.061273359067810444, -0.14329423835127256,
+        0.007607487324976691, 0.03169508781152599, -0.0005421323318000267,
+        -0.0033824159510050036],
+    9: [0.0010694900329086107, -0.0004731544986800494, -0.010264064027633092,
+        0.008859267493400227, 0.062077789302885836, -0.018233770779395836,
+        -0.19155083129728373, 0.03527248803527319, 0.6173384491409343,
+        0.7178970827644116, 0.23876091460730497, -0.05456895843083476,
+        0.0005834627461256364, 0.030224878858274982, -0.011528210207679286,
+        -0.013271967781817193, 0.0006197808889855138, 0.0014009155259146616],
+    10: [-0.00045932942100465363, 5.703608361848479e-05, 0.0045931735853117816,
+         -0.0008043589320164662, -0.02035493981231108, 0.005764912033580839,
+         0.04999497207737552, -0.03199005688242828, -0.03553674047381567,
+         0.3838267610670751, 0.7695100370211, 0.47169066693844014,
+         -0.07088053578323225, -0.15949427888491105, 0.011609893903710807,
+         0.0459272392310917, -0.001465382581304615, -0.008641299277022178,
+         9.563267072283382e-05, 0.0007701598091144554],
+}
+
+
+def daubechies(n):
+    """Return the low-pass (scaling) synthesis filter (2n taps) of the
+    Daubechies wavelet with n vanishing moments: the factor of extremal
+    (minimum) phase, with all its zeros inside the unit circle.
+    """
+    return _filter(n, [zeros[0] for zeros in _zeros(n)])
+
+
+def symlet(n):
+    """Return the low-pass (scaling) synthesis filter (2n taps) of the
+    symlet with n vanishing moments, from the published tables (see
+    SYMLETS). Raise a NotImplementedError for n outside 2 <= n <= 10.
+    """
+    if n not in SYMLETS:
+        raise NotImplementedError('sym{} wavelet is not implemented.'.format(n))
+    return np.array(SYMLETS[n])
+
+
+def quadrature_mirror(lowpass):
+    """Return the high-pass (wavelet) filter of an orthogonal wavelet
+    from its low-pass filter: g[k] = (-1)**k * h[len(h) - 1 - k].
+    """
+    lowpass = np.asarray(lowpass)
+    return (-1)**np.arange(len(lowpass))*lowpass[::-1]
+
+
+def _zeros(n):
+    """Return the pairs (z, 1/z), with z inside the unit circle, of the
+    zeros of |Q(z)|**2 = P(y), where y = (2 - z - 1/z)/4 and
+    P(y) = sum(C(n - 1 + k, k) * y**k for k < n), which with the n zeros
+    at z = -1 make up the zeros of a Daubechies filter.
+    """
+    polynomial = [math.comb(n - 1 + k, k) for k in reversed(range(n))]
+    pairs = []
+    for y in np.roots(polynomial):
+        b = 2 - 4*y
+        root = np.sqrt(b*b - 4 + 0j)
+        inner, outer = sorted([(b + root)/2, (b - root)/2], key=abs)
+        pairs.append((inner, outer))
+    return pairs
+
+
+def _filter(n, zeros):
+    """Return the real filter, normalised to sum to sqrt(2), with n zeros
+    at z = -1 and the others given.
+    """
+    lowpass = np.real(np.poly(np.concatenate([-np.ones(n), zeros])))
+    return lowpass*np.sqrt(2)/lowpass.sum()
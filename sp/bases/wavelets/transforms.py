@@ -7,6 +7,9 @@ functional domain.
 import numpy as np
 
 from .families import Wavelets, Haar
+from .. import batch
+from .. import plans
+from ...instrumentation import instrumented
 
 
 def is_implemented(family):
@@ -14,6 +17,7 @@ def is_implemented(family):
     return family in Wavelets.families.keys()
 
 
+@instrumented
 def get_family(family):
     """Return the family class object. Else raise a NotImplementedError.
     """
@@ -23,34 +27,281 @@ def get_family(family):
         raise NotImplementedError('{} family is not implemented.'.format(family))
 
 
-def idwt(signal, family):
-    """Return the Wavelet coefficients of a 1-dimensional signal."""
+@instrumented
+def idwt(signal, family, levels=None, axis=None, out=None, dtype=None,
+         mode='periodic'):
+    """Return the Wavelet coefficients of a 1-dimensional signal, or of
+    every signal along the axis of an N-dimensional array. Families with
+    a lifting scheme (such as Haar) are transformed in O(m) and families
+    with a filter bank (such as db4) in O(m*filter_len), and either may
+    be partially decomposed to the number of levels given. A filter bank
+    extends the signal by the boundary mode (see families.MODES), which
+    allows any length m. The coefficients are written into out if given.
+    They are computed in the precision of dtype if given, else that of
+    the signal (at least single precision), to within
+    batch.SINGLE_PRECISION_ERROR (relative) of double precision.
+    """
+    signal, axis = batch.check(signal, axis, 1)
+    dtype = batch.precision(signal, dtype)
     Family = get_family(family)
-    return Family.imatrix(len(signal)).dot(signal)
+    if hasattr(Family, 'ilift'):
+        return batch.apply(lambda x, o: Family.ilift(x, levels, o, dtype),
+                           signal, axis, out)
+    if hasattr(Family, 'ifilter'):
+        return batch.apply(lambda x, o: Family.ifilter(x, levels, mode, o, dtype),
+                           signal, axis, out)
+    if levels is not None:
+        raise NotImplementedError('{} family has no partial decomposition.'.format(family))
+    matrix = Family.imatrix(signal.shape[axis], dtype)
+    return batch.matmul(batch.cast(signal, dtype), matrix, axis, out)
+
 
+@instrumented
+def idwt2(signal, family, axes=None, out=None, dtype=None):
+    """Return the Wavelet coefficients of a 2-dimensional signal, or of
+    every 2-dimensional signal along the two axes of an N-dimensional
+    array. The rows and then the columns are transformed a tile at a
+    time, so no wavelet matrix is built for families with a lifting
+    scheme or a filter bank. The coefficients are written into out if
+    given. See idwt for their precision.
+    """
+    signal, axes = batch.check(signal, axes, 2)
+    dtype = batch.precision(signal, dtype)
+    get_family(family)
+    return batch.separable(
+        lambda x, axis: idwt(x, family, axis=axis, dtype=dtype),
+        signal, axes, out, dtype)
 
-def idwt2(signal, family):
-    """Return the Wavelet coefficients of a 2-dimensional signal."""
-    rows, cols = signal.shape
+
+@instrumented
+def dwt(coefficients, family, levels=None, axis=None, out=None, dtype=None,
+        mode='periodic', m=None):
+    """Return the 1-dimensional signal from its Wavelet coefficients, or
+    every signal from the coefficients along the axis of an
+    N-dimensional array. Families with a lifting scheme (such as Haar)
+    or a filter bank (such as db4) are transformed in O(m) and
+    O(m*filter_len) and may be partially reconstructed from the number
+    of levels given. Filter banks in a boundary mode other than periodic
+    give more coefficients than samples, so the signal length m must be
+    given. The signal is written into out if given. See idwt for its
+    precision.
+    """
+    coefficients, axis = batch.check(coefficients, axis, 1)
+    dtype = batch.precision(coefficients, dtype)
     Family = get_family(family)
-    return Family.imatrix(rows).dot(signal.dot(Family.imatrix(cols)))
+    if hasattr(Family, 'lift'):
+        return batch.apply(lambda x, o: Family.lift(x, levels, o, dtype),
+                           coefficients, axis, out)
+    if hasattr(Family, 'filter'):
+        return batch.apply(lambda x, o: Family.filter(x, m, levels, mode, o, dtype),
+                           coefficients, axis, out)
+    if levels is not None:
+        raise NotImplementedError('{} family has no partial decomposition.'.format(family))
+    matrix = Family.matrix(coefficients.shape[axis], dtype)
+    return batch.matmul(batch.cast(coefficients, dtype), matrix, axis, out)
+
+
+@instrumented
+def dwt2(coefficients, family, axes=None, out=None, dtype=None):
+    """Return the 2-dimensional signal from its Wavelet coefficients, or
+    every 2-dimensional signal from the coefficients along the two axes
+    of an N-dimensional array. This is the inverse of idwt2.
+    """
+    coefficients, axes = batch.check(coefficients, axes, 2)
+    dtype = batch.precision(coefficients, dtype)
+    get_family(family)
+    return batch.separable(
+        lambda x, axis: dwt(x, family, axis=axis, dtype=dtype),
+        coefficients, axes, out, dtype)
+
+
+@instrumented
+def ipyramid(signal, family, levels=None, axes=None, out=None, dtype=None):
+    """Return the Wavelet coefficients of the (non-standard) Mallat
+    pyramid of a 2-dimensional signal, or of every 2-dimensional signal
+    along the two axes of an N-dimensional array, for levels levels (by
+    default, as many as both sides stay even for). Each level transforms
+    the rows and then the columns of the previous level's approximation
+    by one level, in place, so the coefficients form a quadtree (see
+    pyramid_bands): at level j, with (r, c) the shape halved j times,
+    [:r, :c] is the approximation (replaced by the next levels),
+    [:r, c:2c] the horizontal details, [r:2r, :c] the vertical details
+    and [r:2r, c:2c] the diagonal details. The coefficients are
+    computed in out if given (which may be the signal itself, for an
+    image buffer of the right precision), else in a copy of the signal
+    in the precision of dtype (see idwt).
+    """
+    signal, axes = batch.check(signal, axes, 2)
+    Family = get_family(family)
+    if out is None:
+        out = np.array(signal, dtype=batch.precision(signal, dtype))
+    elif out is not signal:
+        out[...] = signal
+    moved = np.moveaxis(out, axes, (-2, -1))
+    rows, cols = moved.shape[-2:]
+    levels = _pyramid_levels(rows, cols, levels)
+    for j in range(levels):
+        approximation = moved[..., :rows >> j, :cols >> j]
+        for axis in (-1, -2):
+            idwt(approximation, family, 1, axis, approximation, approximation.dtype)
+    return out
+
+
+@instrumented
+def pyramid(coefficients, family, levels=None, level=0, axes=None, out=None,
+            dtype=None):
+    """Return the 2-dimensional signal from the coefficients of its
+    Mallat pyramid of levels levels, or every signal from coefficients
+    along the two axes of an N-dimensional array. This is the inverse of
+    ipyramid. If level is given, only the levels - level coarsest levels
+    are reconstructed, giving the approximation at that level: a
+    preview of the signal with each side halved level times, at a cost
+    proportional to its size. It is scaled by 2**-level, to the range of
+    the signal. The result is written into out if given (which may be
+    the coefficients themselves if level is 0).
+    """
+    coefficients, axes = batch.check(coefficients, axes, 2)
+    get_family(family)
+    moved = np.moveaxis(coefficients, axes, (-2, -1))
+    rows, cols = moved.shape[-2:]
+    levels = _pyramid_levels(rows, cols, levels)
+    if not 0 <= level <= levels:
+        raise ValueError('The level must be between 0 and {}.'.format(levels))
+    preview = moved[..., :rows >> level, :cols >> level]
+    if out is None:
+        out = np.moveaxis(np.array(preview, dtype=batch.precision(preview, dtype)),
+                          (-2, -1), axes)
+    elif out is not coefficients:
+        np.moveaxis(out, axes, (-2, -1))[...] = preview
+    moved_out = np.moveaxis(out, axes, (-2, -1))
+    for j in reversed(range(level, levels)):
+        approximation = moved_out[..., :rows >> j, :cols >> j]
+        for axis in (-2, -1):
+            dwt(approximation, family, 1, axis, approximation, approximation.dtype)
+    if level:
+        moved_out *= moved_out.dtype.type(2.0**-level)
+    return out
+
+
+def pyramid_bands(shape, levels=None):
+    """Return the layout of the coefficients of a Mallat pyramid of
+    levels levels of a 2-dimensional signal of the shape: a list of
+    (level, band, (row slice, column slice)), from the finest level 1 to
+    the coarsest, where band is 'horizontal', 'vertical' or 'diagonal',
+    followed by (levels, 'approximation', (row slice, column slice)).
+    """
+    rows, cols = shape
+    levels = _pyramid_levels(rows, cols, levels)
+    layout = []
+    for j in range(1, levels + 1):
+        r, c = rows >> j, cols >> j
+        layout += [(j, 'horizontal', (slice(0, r), slice(c, 2*c))),
+                   (j, 'vertical', (slice(r, 2*r), slice(0, c))),
+                   (j, 'diagonal', (slice(r, 2*r), slice(c, 2*c)))]
+    layout.append((levels, 'approximation',
+                   (slice(0, rows >> levels), slice(0, cols >> levels))))
+    return layout
+
+
+def _pyramid_levels(rows, cols, levels=None):
+    """Return the number of levels of a Mallat pyramid of a rows by cols
+    signal: by default, as many as both sides stay even for. Else raise
+    a ValueError if both are not divisible by 2**levels.
+    """
+    if levels is None:
+        levels = 0
+        while rows and cols and (rows >> levels) % 2 == 0 and (cols >> levels) % 2 == 0:
+            levels += 1
+        return levels
+    if levels < 0 or rows % 2**levels != 0 or cols % 2**levels != 0:
+        raise ValueError("The sides must be divisible by 2**levels.")
+    return levels
+
 
+def plan(m, family, dtype=float):
+    """Return the (stored) plan of the wavelet transform of length m for
+    the wavelet family in the precision of dtype. The plan is built the
+    first time it is asked for.
+    """
+    get_family(family)
+    dtype = np.dtype(dtype)
+    return plans.get((family, m, dtype.name),
+                     lambda: WaveletPlan(m, family, dtype))
+
+
+class WaveletPlan:
+    """A plan of the wavelet transform of length m for a wavelet family,
+    computed in dtype. Families with a lifting scheme (such as Haar) or a
+    filter bank (such as db4) need no tables; for others the wavelet
+    matrix is built once, when the plan is made.
+    """
 
-def dwt(coefficients, family):
-    """Return the 1-dimensional signal from its Wavelet coefficients."""
+    def __init__(self, m, family, dtype=float):
+        self.m = m
+        self.family = family
+        self.dtype = np.dtype(dtype)
+        Family = get_family(family)
+        self.matrix = None
+        if not hasattr(Family, 'lift') and not hasattr(Family, 'filter'):
+            self.matrix = Family.matrix(m, self.dtype)
+
+    def execute(self, signal):
+        """Return the wavelet coefficients of the signal (along its last
+        axis).
+        """
+        signal = self._check(signal)
+        if self.matrix is None:
+            return idwt(signal, self.family, axis=-1, dtype=self.dtype)
+        return np.matmul(signal, self.matrix)
+
+    def inverse(self, coefficients):
+        """Return the signal (along the last axis) from its wavelet
+        coefficients.
+        """
+        coefficients = self._check(coefficients)
+        if self.matrix is None:
+            return dwt(coefficients, self.family, axis=-1, dtype=self.dtype)
+        return np.matmul(coefficients, self.matrix.T)
+
+    def _check(self, x):
+        """Return x as an array if its last axis is of the plan's length.
+        Else raise a ValueError.
+        """
+        x = np.asarray(x)
+        if x.ndim == 0 or x.shape[-1] != self.m:
+            raise ValueError('Signal is not of length {}.'.format(self.m))
+        return x
+
+
+@instrumented
+def scalogram(signal, family, axis=None, dtype=None):
+    """Return a 2-dimensional array (m by the number of dilations) of
+    the amplitude of each wavelet of each dilation across the length of
+    a 1-dimensional signal, or such an array for every signal along the
+    axis of an N-dimensional array (in place of that axis). Families
+    with a scalogram (such as Haar and the filter banks) compute it
+    directly from the coefficients. Others scale and squeeze their
+    matrix.
+    """
+    signal, axis = batch.check(signal, axis, 1)
+    axis %= signal.ndim
     Family = get_family(family)
-    return Family.matrix(len(coefficients)).dot(coefficients)
+    coefficients = np.moveaxis(idwt(signal, family, axis=axis, dtype=dtype), axis, -1)
+    if hasattr(Family, 'scalogram'):
+        amplitudes = Family.scalogram(coefficients)
+    else:
+        wavelet_matrix = Family.matrix(coefficients.shape[-1])
+        amplitudes = np.stack([Family.squeeze(np.multiply(wavelet_matrix, c))
+                               for c in coefficients.reshape(-1, len(wavelet_matrix))])
+        amplitudes = amplitudes.reshape(coefficients.shape[:-1] + amplitudes.shape[1:])
+    return np.moveaxis(amplitudes, (-2, -1), (axis, axis + 1))
 
 
+@instrumented
 def heatmap_matrix(signal, family):
     """Return a 2-dimensional array of the wavelet matrix, with each
     wavelet scaled by its corresponding coefficient (its amplitude) and
     compressed (so that the number of columns equals the number of
-    dilations) for a 1-dimensional signal.
+    dilations) for a 1-dimensional signal. See scalogram.
     """
-    Family = get_family(family)
-    wavelet_matrix = Family.matrix(len(signal))
-    coefficients = idwt(signal, family)
-    pre_compress = np.multiply(wavelet_matrix, coefficients)
-    return Family.squeeze(pre_compress)
-    #ij,jk->ijk
+    return scalogram(signal, family)
@@ -0,0 +1,201 @@
+"""This module provides the functionality to compress (or denoise) a
+signal by dropping the small coefficients of its transform and storing
+the rest in a compact, sparse form from which the signal can be
+reconstructed.
+"""
+
+
+import json
+import time
+
+import numpy as np
+
+from .bases import fourier, wavelets
+
+
+def hard(coefficients, threshold):
+    """Return the coefficients with those of magnitude below the
+    threshold set to zero.
+    """
+    coefficients = np.asarray(coefficients)
+    return np.where(np.abs(coefficients) < threshold, 0, coefficients)
+
+
+def soft(coefficients, threshold):
+    """Return the coefficients with their magnitudes reduced by the
+    threshold (those of magnitude below it becoming zero).
+    """
+    coefficients = np.asarray(coefficients)
+    magnitudes = np.abs(coefficients)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = np.maximum(1 - threshold/magnitudes, 0)
+    return coefficients*np.nan_to_num(scale)
+
+
+def top_k(coefficients, k):
+    """Return the coefficients with all but the k largest (in magnitude)
+    set to zero.
+    """
+    coefficients = np.asarray(coefficients)
+    kept = np.zeros_like(coefficients)
+    if k > 0:
+        flat = np.abs(coefficients).ravel()
+        largest = np.argpartition(flat, -k)[-k:] if k < flat.size else slice(None)
+        kept.flat[largest] = coefficients.flat[largest]
+    return kept
+
+
+def energy(coefficients, fraction):
+    """Return the coefficients with all but the fewest largest (in
+    magnitude) that hold the fraction of the total energy set to zero.
+    """
+    coefficients = np.asarray(coefficients)
+    if coefficients.size == 0:
+        return coefficients.copy()
+    energies = np.cumsum(np.sort(np.abs(coefficients).ravel()**2)[::-1])
+    k = int(np.searchsorted(energies, fraction*energies[-1])) + 1
+    return top_k(coefficients, min(k, coefficients.size))
+
+
+thresholds = {'hard': hard, 'soft': soft, 'top_k': top_k, 'energy': energy}
+
+
+def threshold(coefficients, method, parameter):
+    """Return the coefficients thresholded by the method ('hard', 'soft',
+    'top_k' or 'energy') with its parameter. Else raise a
+    NotImplementedError.
+    """
+    if method not in thresholds:
+        raise NotImplementedError('{} thresholding is not implemented.'.format(method))
+    return thresholds[method](coefficients, parameter)
+
+
+class SparseCoefficients:
+    """The non-zero coefficients of a 1 or 2-dimensional signal in the
+    basis of a family ('Fourier' or a wavelet family). The flat indices
+    are stored in the smallest unsigned integer type that holds them.
+    """
+
+    def __init__(self, family, shape, indices, values):
+        self.family = family
+        self.shape = tuple(shape)
+        self.indices = np.asarray(indices, dtype=index_dtype(self.shape))
+        self.values = np.asarray(values)
+
+    @classmethod
+    def from_dense(cls, coefficients, family, dtype=None):
+        """Return the sparse form of the (thresholded) coefficients, with
+        the values stored as dtype if given.
+        """
+        coefficients = np.asarray(coefficients)
+        indices = np.flatnonzero(coefficients)
+        values = coefficients.ravel()[indices]
+        if dtype is not None:
+            values = values.astype(dtype)
+        return cls(family, coefficients.shape, indices, values)
+
+    @property
+    def nbytes(self):
+        """Return the number of bytes of the indices and values."""
+        return self.indices.nbytes + self.values.nbytes
+
+    def dense(self):
+        """Return the coefficients as a dense array."""
+        coefficients = np.zeros(int(np.prod(self.shape)), dtype=self.values.dtype)
+        coefficients[self.indices] = self.values
+        return coefficients.reshape(self.shape)
+
+    def reconstruct(self):
+        """Return the signal reconstructed from the coefficients."""
+        return reconstruct(self.dense(), self.family)
+
+    def header(self):
+        """Return the family, shape and dtype of the coefficients."""
+        return {'family': self.family, 'shape': list(self.shape),
+                'dtype': self.values.dtype.str}
+
+
+def index_dtype(shape):
+    """Return the smallest unsigned integer type that can index an array
+    of the shape.
+    """
+    return np.min_scalar_type(max(int(np.prod(shape)) - 1, 0))
+
+
+def transform(signal, family):
+    """Return the coefficients of a 1 or 2-dimensional signal in the
+    basis of the family ('Fourier' or a wavelet family).
+    """
+    signal = np.asarray(signal)
+    if family == 'Fourier':
+        return fourier.ifft(signal) if signal.ndim == 1 else fourier.idft2(signal)
+    if signal.ndim == 1:
+        return wavelets.idwt(signal, family)
+    return wavelets.idwt2(signal, family)
+
+
+def reconstruct(coefficients, family):
+    """Return the 1 or 2-dimensional signal from its coefficients in the
+    basis of the family ('Fourier' or a wavelet family).
+    """
+    coefficients = np.asarray(coefficients)
+    if family == 'Fourier':
+        if coefficients.ndim == 1:
+            return fourier.fft(coefficients)
+        return fourier.dft2(coefficients)
+    if coefficients.ndim == 1:
+        return wavelets.dwt(coefficients, family)
+    return wavelets.dwt2(coefficients, family)
+
+
+def compress(signal, family, method, parameter, dtype=None):
+    """Return the sparse coefficients of the signal in the basis of the
+    family after thresholding them by the method with its parameter. See
+    threshold.
+    """
+    coefficients = threshold(transform(signal, family), method, parameter)
+    return SparseCoefficients.from_dense(coefficients, family, dtype)
+
+
+def save(filename, sparse):
+    """Save a list of sparse coefficients to the (.npz) file, filename."""
+    arrays = {'header': np.array(json.dumps([s.header() for s in sparse]))}
+    for i, s in enumerate(sparse):
+        arrays['indices_{}'.format(i)] = s.indices
+        arrays['values_{}'.format(i)] = s.values
+    with open(filename, 'wb') as f:
+        np.savez(f, **arrays)
+
+
+def load(filename):
+    """Return the list of sparse coefficients saved in the file,
+    filename.
+    """
+    with np.load(filename, allow_pickle=False) as arrays:
+        headers = json.loads(str(arrays['header']))
+        return [SparseCoefficients(h['family'], h['shape'],
+                                   arrays['indices_{}'.format(i)],
+                                   arrays['values_{}'.format(i)].astype(h['dtype']))
+                for i, h in enumerate(headers)]
+
+
+def report(signal, family, method, parameter, dtype=None):
+    """Return a dictionary of the compression ratio (of the bytes of the
+    signal to those of its sparse coefficients), the relative
+    reconstruction error and the encode and decode throughputs (in
+    samples per second) of compressing the signal.
+    """
+    signal = np.asarray(signal)
+    start = time.perf_counter()
+    sparse = compress(signal, family, method, parameter, dtype)
+    encoded = time.perf_counter()
+    reconstructed = sparse.reconstruct()
+    decoded = time.perf_counter()
+    if family == 'Fourier':
+        reconstructed = reconstructed.real
+    error = np.linalg.norm(reconstructed - signal)/np.linalg.norm(signal)
+    return {'ratio': signal.nbytes/max(sparse.nbytes, 1),
+            'error': error,
+            'kept': len(sparse.values),
+            'encode': signal.size/(encoded - start),
+            'decode': signal.size/(decoded - encoded)}
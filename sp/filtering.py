@@ -0,0 +1,300 @@
+"""This module provides convolution, correlation and FIR filtering of
+signals, computed directly or through the Fourier basis (in which the
+circular convolution of two signals is diagonal: the product of their
+coefficients), whichever is estimated to be faster.
+"""
+
+
+import numpy as np
+
+from .bases import batch
+from .bases import fourier
+from .instrumentation import instrumented
+
+
+# The parts of the full convolution (of length n + k - 1) returned, as
+# in numpy.convolve: all of it, the middle max(n, k) or the
+# max(n, k) - min(n, k) + 1 samples computed without zero padding.
+MODES = ('full', 'same', 'valid')
+
+METHODS = ('auto', 'direct', 'fft')
+
+# The costs, in multiply-adds of the direct convolution, of each pass
+# of the direct convolution (one per sample of the shorter array), of a
+# convolution through the Fourier basis of length m per m*log2(m), and
+# of setting one up (finding its plans). They were measured with
+# benchmarks.filtering.
+PASS_COST = 4000
+FFT_COST = 30
+FFT_OVERHEAD = 80000
+
+
+@instrumented
+def convolve(signal, kernel, mode='full', method='auto', axis=None, out=None,
+             dtype=None):
+    """Return the convolution of a 1-dimensional signal (length n) with
+    the 1-dimensional kernel (length k), or of every signal along the
+    axis of an N-dimensional array, as numpy.convolve does. It is
+    computed directly in O(n*k), or through the real (or complex) Fast
+    Fourier Transform of a length of at least n + k - 1 with small
+    prime factors, in O((n + k) log(n + k)). By default, the method
+    estimated to be faster is chosen (see choose_method). The result is
+    written into out if given. It is computed in the precision of dtype
+    if given, else that of the signal and kernel (at least single
+    precision).
+    """
+    return _filter(signal, _kernel(kernel), mode, method, axis, out, dtype)
+
+
+@instrumented
+def correlate(signal, kernel, mode='valid', method='auto', axis=None, out=None,
+              dtype=None):
+    """Return the cross-correlation of a 1-dimensional signal with the
+    1-dimensional kernel, or of every signal along the axis of an
+    N-dimensional array, as numpy.correlate does: the convolution with
+    the reversed complex conjugate of the kernel. See convolve.
+    """
+    return _filter(signal, np.conj(_kernel(kernel)[::-1]), mode, method,
+                   axis, out, dtype, correlation=True)
+
+
+@instrumented
+def fir_filter(taps, signal, method='auto', axis=None, out=None, dtype=None):
+    """Return the 1-dimensional signal filtered by the finite impulse
+    response filter of the taps, or every signal along the axis of an
+    N-dimensional array: y[i] = sum(taps[j]*signal[i - j]), the first n
+    samples of their convolution, with the signal taken as zero before
+    its start. See convolve, and OverlapAdd for unbounded signals.
+    """
+    signal, axis = batch.check(signal, axis, 1)
+    taps = _kernel(taps)
+    n = signal.shape[axis]
+    return batch.apply(lambda x, o: _convolve(x, taps, method, dtype, 0, n, o),
+                       signal, axis, out)
+
+
+def choose_method(n, k):
+    """Return the method estimated to convolve a signal of length n with
+    a kernel of length k faster: 'direct' (one pass over the longer per
+    sample of the shorter) or 'fft' (three transforms of length
+    fast_length(n + k - 1)).
+    """
+    size = fast_length(n + k - 1)
+    direct = min(n, k)*(max(n, k) + PASS_COST)
+    fft = FFT_COST*size*np.log2(size) + FFT_OVERHEAD
+    return 'direct' if direct <= fft else 'fft'
+
+
+def fast_length(n):
+    """Return the smallest even length (so that real transforms halve
+    it) no less than n whose prime factors are only 2, 3 and 5, for
+    which the Fast Fourier Transform is fastest.
+    """
+    half = (int(n) + 1)//2
+    best = 1 << max(half - 1, 0).bit_length()
+    fives = 1
+    while fives < best:
+        threes = fives
+        while threes < best:
+            length = threes
+            while length < half:
+                length *= 2
+            best = min(best, length)
+            threes *= 3
+        fives *= 5
+    return 2*best
+
+
+class OverlapAdd:
+    """The finite impulse response filter of the taps (k of them) applied
+    to a stream, by overlap-add: each block of samples is convolved with
+    the taps (through the Fourier basis, reusing the taps' coefficients,
+    if faster) and the last k - 1 samples of each convolution are added
+    to the start of the next. The samples returned, however the stream
+    is chunked, are those of fir_filter applied to the whole stream,
+    computed in the precision of dtype (by default, of the taps),
+    promoted to complex if the samples are.
+    """
+
+    def __init__(self, taps, block=None, dtype=None):
+        self.taps = _kernel(taps)
+        k = len(self.taps)
+        self.requested = dtype
+        self.block = block or fast_length(max(8*k, 256)) - k + 1
+        self.method = choose_method(self.block, k)
+        self.reset()
+
+    def reset(self):
+        """Forget the stream so far."""
+        self.tail = None
+        self._configure(batch.precision(self.taps, self.requested))
+
+    def update(self, samples):
+        """Add the samples (along the last axis) to the stream and return
+        the filtered samples.
+        """
+        samples = np.asarray(samples)
+        n, k = samples.shape[-1], len(self.taps)
+        dtype = np.result_type(self.dtype, batch.precision(samples, self.requested))
+        if dtype != self.dtype:
+            self._configure(dtype)
+        if self.tail is None:
+            self.tail = np.zeros(samples.shape[:-1] + (k - 1,), dtype=self.dtype)
+        else:
+            self.tail = self.tail.astype(self.dtype, copy=False)
+        out = np.empty(samples.shape, dtype=self.dtype)
+        for start in range(0, n, self.block):
+            x = samples[..., start:start + self.block]
+            b = x.shape[-1]
+            if self.spectrum is None:
+                y = _direct(x, self.taps, self.dtype)
+            else:
+                y = self.spectrum.convolve(x)[..., :b + k - 1]
+            y[..., :k - 1] += self.tail
+            out[..., start:start + b] = y[..., :b]
+            self.tail = y[..., b:].copy()
+        return out
+
+    def _configure(self, dtype):
+        """Compute the stream in dtype, with the taps' coefficients in it
+        if the Fourier basis is used.
+        """
+        self.dtype = np.dtype(dtype)
+        self.spectrum = None
+        if self.method == 'fft':
+            m = fast_length(self.block + len(self.taps) - 1)
+            self.spectrum = _Spectrum(self.taps, m, self.dtype)
+
+
+class _Spectrum:
+    """The Fourier coefficients of a kernel zero-padded to the length m,
+    computed in dtype, with which signals of up to m - k + 1 samples are
+    convolved by multiplying their coefficients. Real kernels in real
+    dtypes use the real transform (half of the coefficients).
+    """
+
+    def __init__(self, kernel, m, dtype):
+        self.m = m
+        self.dtype = np.dtype(dtype)
+        self.real = self.dtype.kind == 'f'
+        complex_dtype = np.result_type(self.dtype, np.complex64)
+        padded = np.zeros(m, dtype=self.dtype)
+        padded[:len(kernel)] = kernel
+        if self.real:
+            self.plan = fourier.rplan(m, complex_dtype)
+            self.coefficients = self.plan.execute(padded)*np.sqrt(m)
+        else:
+            self.plan = fourier.plan(m, complex_dtype)
+            self.coefficients = self.plan.transform(padded)/m
+        self.coefficients = self.coefficients.astype(complex_dtype)
+
+    def convolve(self, signal):
+        """Return the circular convolution (of length m) of the signal
+        (along its last axis, zero-padded to m) with the kernel.
+        """
+        padded = np.zeros(signal.shape[:-1] + (self.m,), dtype=self.dtype)
+        padded[..., :signal.shape[-1]] = signal
+        if self.real:
+            return self.plan.inverse(self.plan.execute(padded)*self.coefficients)
+        product = self.plan.transform(padded)*self.coefficients
+        return self.plan.transform(product.conj()).conj()
+
+
+def _kernel(kernel):
+    """Return the kernel as an array if it is 1-dimensional and not
+    empty. Else raise a ValueError.
+    """
+    kernel = np.asarray(kernel)
+    if kernel.ndim != 1 or len(kernel) == 0:
+        raise ValueError('Kernel is not a non-empty 1-dimensional array.')
+    return kernel
+
+
+def _filter(signal, kernel, mode, method, axis, out, dtype, correlation=False):
+    """Return the part of the full convolution of the signal (along the
+    axis) with the kernel returned in the mode (see convolve and
+    correlate).
+    """
+    signal, axis = batch.check(signal, axis, 1)
+    start, length = _window(signal.shape[axis], len(kernel), mode, correlation)
+    return batch.apply(
+        lambda x, o: _convolve(x, kernel, method, dtype, start, length, o),
+        signal, axis, out)
+
+
+def _window(n, k, mode, correlation=False):
+    """Return the start and length of the part of the full convolution
+    of lengths n and k returned in the mode. A correlation of a signal
+    shorter than its kernel is centred as numpy.correlate does it, which
+    differs from numpy.convolve for a signal of even length.
+    """
+    if n == 0:
+        raise ValueError('Signal is empty.')
+    if mode == 'full':
+        return 0, n + k - 1
+    if mode == 'same':
+        if correlation and n < k:
+            return n//2, k
+        return (min(n, k) - 1)//2, max(n, k)
+    if mode == 'valid':
+        return min(n, k) - 1, max(n, k) - min(n, k) + 1
+    raise NotImplementedError('{} mode is not implemented.'.format(mode))
+
+
+def _convolve(signal, kernel, method, dtype, start=0, length=None, out=None):
+    """Return the part (of the length from start) of the full
+    convolution of the signal (along its last axis) with the kernel by
+    the method, in the precision of dtype (see convolve), written into
+    out if given.
+    """
+    dtype = np.result_type(batch.precision(signal, dtype),
+                           batch.precision(kernel, dtype))
+    n, k = signal.shape[-1], len(kernel)
+    if length is None:
+        length = n + k - 1 - start
+    if method == 'auto':
+        method = choose_method(n, k)
+    if method == 'direct':
+        return _direct(signal, kernel, dtype, start, length, out)
+    if method == 'fft':
+        full = _Spectrum(kernel, fast_length(n + k - 1), dtype).convolve(signal)
+        if out is None:
+            return full[..., start:start + length]
+        out[...] = full[..., start:start + length]
+        return out
+    raise NotImplementedError('{} method is not implemented.'.format(method))
+
+
+def _direct(signal, kernel, dtype, start=0, length=None, out=None):
+    """Return the part (of the length from start) of the full
+    convolution of the signal (along its last axis) with the kernel,
+    computed directly: a pass over the longer of the two for each sample
+    of the shorter, accumulating only the samples in the part. It is
+    accumulated in out if given and of dtype, else copied into it.
+    """
+    n, k = signal.shape[-1], len(kernel)
+    if length is None:
+        length = n + k - 1 - start
+    signal = signal.astype(dtype, copy=False)
+    kernel = kernel.astype(dtype, copy=False)
+    if out is not None and out.dtype == dtype:
+        part = out
+        part[...] = 0
+    else:
+        part = np.zeros(signal.shape[:-1] + (length,), dtype=dtype)
+    end = start + length
+    if k <= n:
+        for j in range(k):
+            low, high = max(start - j, 0), min(end - j, n)
+            if low < high:
+                part[..., j + low - start:j + high - start] += kernel[j]*signal[..., low:high]
+    else:
+        for i in range(n):
+            low, high = max(start - i, 0), min(end - i, k)
+            if low < high:
+                part[..., i + low - start:i + high - start] += \
+                    signal[..., i:i + 1]*kernel[low:high]
+    if out is not None and part is not out:
+        out[...] = part
+        return out
+    return part
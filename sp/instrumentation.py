@@ -0,0 +1,143 @@
+"""This module provides opt-in instrumentation of the functions of sp:
+the number of calls and the timings of each instrumented function, and
+counters such as the bytes of basis matrices built and the hits of the
+basis cache. Collection is off by default, when an instrumented function
+costs only a check of a flag. Each measurement can also be passed to a
+sink (e.g. to forward it to an exporter of metrics).
+"""
+
+
+import collections
+import contextlib
+import functools
+import threading
+import time
+
+import numpy as np
+
+
+# The number of the most recent timings of each function kept for its
+# percentiles.
+HISTORY = 10000
+
+_enabled = False
+_sink = None
+_lock = threading.Lock()
+_timings = {}
+_counters = collections.Counter()
+
+
+class Timings:
+    """The number of calls, the total time and the most recent times of
+    an instrumented function.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.recent = collections.deque(maxlen=HISTORY)
+
+    def add(self, seconds):
+        """Add a call that took seconds."""
+        self.calls += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+    def summary(self):
+        """Return a dictionary of the calls, the total and mean times and
+        the 50th, 90th and 99th percentiles of the recent times.
+        """
+        p50, p90, p99 = np.percentile(self.recent, [50, 90, 99])
+        return {'calls': self.calls, 'total': self.total,
+                'mean': self.total/self.calls, 'p50': p50, 'p90': p90,
+                'p99': p99}
+
+
+def instrumented(func):
+    """A decorator for timing each call of a function while collection
+    is enabled. The function is recorded under its module (without the
+    leading 'sp.') and qualified name, e.g. 'bases.fourier.idft'.
+    """
+    name = '{}.{}'.format(func.__module__.replace('sp.', '', 1),
+                          func.__qualname__)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record(name, time.perf_counter() - start)
+    return wrapper
+
+
+def record(name, seconds):
+    """Record a call of the function, name, that took seconds."""
+    with _lock:
+        if name not in _timings:
+            _timings[name] = Timings()
+        _timings[name].add(seconds)
+    if _sink is not None:
+        _sink('timing', name, seconds)
+
+
+def count(name, amount=1):
+    """Add the amount to the counter, name, if collection is enabled."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] += amount
+    if _sink is not None:
+        _sink('count', name, amount)
+
+
+def enable(sink=None):
+    """Enable collection, passing each measurement to the sink if one is
+    given. The sink is called as sink(kind, name, value), where kind is
+    'timing' (value in seconds) or 'count'.
+    """
+    global _enabled, _sink
+    _enabled = True
+    _sink = sink
+
+
+def disable():
+    """Disable collection."""
+    global _enabled, _sink
+    _enabled = False
+    _sink = None
+
+
+def reset():
+    """Forget all the measurements collected."""
+    with _lock:
+        _timings.clear()
+        _counters.clear()
+
+
+def stats():
+    """Return a snapshot of the measurements collected: a dictionary of
+    the timings of each function (see Timings.summary) and the counters.
+    """
+    with _lock:
+        return {'timings': {name: timings.summary()
+                            for name, timings in _timings.items()},
+                'counters': dict(_counters)}
+
+
+@contextlib.contextmanager
+def collecting(sink=None):
+    """A context manager that enables collection (with the sink, if
+    given) of fresh measurements within its scope, restoring the
+    previous state afterwards.
+    """
+    global _enabled, _sink
+    previous = _enabled, _sink
+    reset()
+    enable(sink)
+    try:
+        yield
+    finally:
+        _enabled, _sink = previous
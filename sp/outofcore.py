@@ -0,0 +1,169 @@
+"""This module provides the functionality to transform recordings that
+are larger than memory. Signals are read from and written to .npy files
+through memory maps, a chunk at a time, and the chunks completed are
+recorded in a checkpoint file so that an interrupted job can be resumed.
+"""
+
+
+import json
+import os
+
+import numpy as np
+
+from .bases import fourier, wavelets
+
+
+# The size (in bytes) of the chunks of a recording that are read into
+# memory at once.
+CHUNK_BYTES = 2**26
+
+
+def transform(source, destination, family, inverse=False, chunk=None,
+              progress=None, checkpoint=None):
+    """Write the transform into the basis of the family ('Fourier' or a
+    wavelet family) of the recording in source (a .npy filename or an
+    array, such as a np.memmap) to the .npy file, destination, or the
+    signal from its coefficients if inverse is True.
+
+    A 2-dimensional recording is a batch of signals (one per row), which
+    are transformed chunk rows at a time. A 1-dimensional recording is a
+    single long signal, which is transformed in chunks of chunk samples
+    (a power of two) by wavelet families with a lifting scheme.
+
+    progress(done, total) is called after each chunk. If a checkpoint
+    filename is given, the number of chunks done is saved to it after
+    each chunk and a job interrupted part way is resumed from there.
+    The checkpoint is removed when the job is complete.
+    """
+    signals = np.load(source, mmap_mode='r') if isinstance(source, str) \
+        else source
+    if signals.ndim == 2:
+        return _transform_rows(signals, destination, family, inverse, chunk,
+                               progress, checkpoint)
+    if signals.ndim == 1:
+        return _transform_long(signals, destination, family, inverse, chunk,
+                               progress, checkpoint)
+    raise ValueError('Signal is not 1 or 2-dimensional.')
+
+
+def _transform_rows(signals, destination, family, inverse, chunk, progress,
+                    checkpoint):
+    """Transform each row of the signals in chunks of chunk rows."""
+    rows, cols = signals.shape
+    if family == 'Fourier':
+        dtype = np.result_type(signals.dtype, np.complex64)
+        function = fourier.fft if inverse else fourier.ifft
+        apply = lambda x, out: function(x, axis=1, out=out)
+    else:
+        dtype = np.result_type(signals.dtype, np.float32)
+        function = wavelets.dwt if inverse else wavelets.idwt
+        apply = lambda x, out: function(x, family, axis=1, out=out)
+    chunk = chunk or max(CHUNK_BYTES // max(cols*np.dtype(dtype).itemsize, 1), 1)
+    out, done, _ = _open(destination, signals.shape, dtype, checkpoint)
+    total = -(-rows // chunk)
+    for i in range(done, total):
+        block = slice(i*chunk, (i + 1)*chunk)
+        apply(np.asarray(signals[block]), out[block])
+        _complete(out, i + 1, total, progress, checkpoint)
+    _finish(checkpoint)
+    return out
+
+
+def _transform_long(signals, destination, family, inverse, chunk, progress,
+                    checkpoint):
+    """Transform a long signal in chunks of chunk samples. In the first
+    pass, each chunk is fully decomposed on its own, which gives all the
+    detail coefficients of the levels within a chunk. The approximation
+    of each chunk is kept in the (otherwise unused) start of the output
+    and these are decomposed in memory in the second pass. The inverse
+    runs the other way around.
+    """
+    Family = wavelets.get_family(family) if family != 'Fourier' else None
+    if not hasattr(Family, 'ilift'):
+        raise NotImplementedError(
+            '{} family cannot transform a long signal in chunks.'.format(family))
+    m = len(signals)
+    dtype = np.result_type(signals.dtype, np.float32)
+    chunk = min(chunk or 2**int(np.log2(max(CHUNK_BYTES // dtype.itemsize, 1))), m)
+    levels = int(np.log2(chunk))
+    if not np.log2(m).is_integer() or not np.log2(chunk).is_integer():
+        raise ValueError("The values of log2(m) and log2(chunk) must be whole numbers.")
+    count = m // chunk
+    out, done, pending = _open(destination, signals.shape, dtype, checkpoint)
+    # The positions of the details of each level (finest first) of a chunk
+    # within the chunk's coefficients and within the whole signal's.
+    spans = [(chunk >> j, m >> j) for j in range(1, levels + 1)]
+    if inverse:
+        approximations = Family.lift(np.asarray(signals[:count]))
+    for c in range(done, count):
+        if inverse:
+            local = np.empty(chunk, dtype=dtype)
+            local[0] = approximations[c]
+            for size, start in spans:
+                local[size:2*size] = signals[start + c*size:start + (c + 1)*size]
+            out[c*chunk:(c + 1)*chunk] = Family.lift(local)
+        else:
+            local = Family.ilift(np.asarray(signals[c*chunk:(c + 1)*chunk]))
+            out[c] = local[0]
+            for size, start in spans:
+                out[start + c*size:start + (c + 1)*size] = local[size:2*size]
+        _complete(out, c + 1, count, progress, checkpoint)
+    if not inverse and done < count + 1:
+        # The second pass overwrites its own input, so its result is
+        # saved in the checkpoint before it is written. A resumed job
+        # writes the saved result again rather than decomposing the
+        # approximations twice.
+        if pending is None:
+            pending = Family.ilift(np.array(out[:count]))
+            _complete(out, count, count, None, checkpoint, pending)
+        out[:count] = pending
+        _complete(out, count + 1, count, None, checkpoint)
+    _finish(checkpoint)
+    return out
+
+
+def _open(destination, shape, dtype, checkpoint):
+    """Return the memory map of the .npy file, destination, the number
+    of chunks already done and the result saved to be written (if any).
+    The file is reopened if a checkpoint of an earlier job exists, else
+    it is created. Raise a ValueError if the file to be reopened is not
+    of the shape and dtype of the output.
+    """
+    if checkpoint is not None and os.path.exists(checkpoint) \
+            and os.path.exists(destination):
+        with open(checkpoint) as f:
+            state = json.load(f)
+        out = np.load(destination, mmap_mode='r+')
+        if out.shape != tuple(shape) or out.dtype != dtype:
+            raise ValueError('Destination is not of shape {} and dtype {}.'.format(
+                tuple(shape), np.dtype(dtype)))
+        pending = state.get('pending')
+        if pending is not None:
+            pending = np.array(pending, dtype=dtype)
+        return out, state['done'], pending
+    out = np.lib.format.open_memmap(destination, mode='w+', dtype=dtype,
+                                    shape=shape)
+    return out, 0, None
+
+
+def _complete(out, done, total, progress, checkpoint, pending=None):
+    """Flush the output and record that done chunks (of total) are
+    complete, and the result (if any) that is pending to be written.
+    """
+    out.flush()
+    if checkpoint is not None:
+        state = {'done': done, 'total': total}
+        if pending is not None:
+            state['pending'] = pending.tolist()
+        temporary = checkpoint + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(state, f)
+        os.replace(temporary, checkpoint)
+    if progress is not None:
+        progress(min(done, total), total)
+
+
+def _finish(checkpoint):
+    """Remove the checkpoint of a complete job."""
+    if checkpoint is not None and os.path.exists(checkpoint):
+        os.remove(checkpoint)
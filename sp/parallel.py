@@ -0,0 +1,147 @@
+"""This module provides the functionality to transform a batch of
+signals (or images) across a pool of worker processes. The batch and
+its transform are held in shared memory so that no array is pickled
+between the processes, and each worker keeps its own plans and cached
+bases for the lifetime of the pool.
+"""
+
+
+import multiprocessing
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from .bases import fourier, plans, wavelets
+
+
+# The transforms that can be run by the workers, with the number of
+# dimensions of each signal and the (least precise) type of their
+# results.
+transforms = {
+    'idft': (fourier.idft, 1, np.complex64),
+    'dft': (fourier.dft, 1, np.complex64),
+    'ifft': (fourier.ifft, 1, np.complex64),
+    'fft': (fourier.fft, 1, np.complex64),
+    'idft2': (fourier.idft2, 2, np.complex64),
+    'dft2': (fourier.dft2, 2, np.complex64),
+    'idwt': (wavelets.idwt, 1, np.float32),
+    'dwt': (wavelets.dwt, 1, np.float32),
+    'idwt2': (wavelets.idwt2, 2, np.float32),
+    'dwt2': (wavelets.dwt2, 2, np.float32),
+}
+
+
+class Executor:
+    """A pool of worker processes that transform batches of signals held
+    in shared memory. The batch is split along its first axis into
+    chunks of chunk signals, and the results are in the order of the
+    batch. If a wisdom filename is given, each worker loads the saved
+    plans when it starts.
+    """
+
+    def __init__(self, workers=None, chunk=None, wisdom=None):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.chunk = chunk
+        # Start the tracker of shared memory before the workers so that
+        # they share it, rather than each claiming the memory they use.
+        resource_tracker.ensure_running()
+        self.pool = multiprocessing.Pool(self.workers, _start, (wisdom,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stop the worker processes."""
+        self.pool.close()
+        self.pool.join()
+
+    def transform(self, name, signals, *args, **kwargs):
+        """Return the transform (named as in the transforms dictionary)
+        of each signal of the batch, signals, with the further arguments
+        given (e.g. the wavelet family). The shape and type of the
+        results (which some transforms, such as a filter bank in a
+        boundary mode other than periodic, change) are those of the
+        first signal's, which is transformed here.
+        """
+        if name not in transforms:
+            raise NotImplementedError('{} transform is not implemented.'.format(name))
+        function, ndim, kind = transforms[name]
+        signals = np.asarray(signals)
+        if signals.ndim != ndim + 1:
+            raise ValueError('Signals are not a batch of {}-dimensional signals.'.format(ndim))
+        count = len(signals)
+        if count:
+            first = function(signals[:1], *args, **dict(kwargs, **_axes(ndim)))
+            shape, dtype = (count,) + first.shape[1:], first.dtype
+        else:
+            shape, dtype = signals.shape, np.result_type(signals.dtype, kind)
+        chunk = self.chunk or max(-(-count // (4*self.workers)), 1)
+        source = _share(signals.shape, signals.dtype)
+        result = _share(shape, dtype)
+        try:
+            _view(source, signals.shape, signals.dtype)[...] = signals
+            if count:
+                _view(result, shape, dtype)[:1] = first
+            tasks = [(name, args, kwargs, source.name, signals.dtype.str,
+                      signals.shape, result.name, dtype.str, shape, i, i + chunk)
+                     for i in range(1, count, chunk)]
+            self.pool.map(_work, tasks)
+            return _view(result, shape, dtype).copy()
+        finally:
+            for memory in [source, result]:
+                memory.close()
+                memory.unlink()
+
+
+def transform(name, signals, *args, workers=None, chunk=None, **kwargs):
+    """Return the transform of each signal of a batch across a temporary
+    pool of worker processes. See Executor.transform.
+    """
+    with Executor(workers, chunk) as executor:
+        return executor.transform(name, signals, *args, **kwargs)
+
+
+def _share(shape, dtype):
+    """Return a new block of shared memory for an array."""
+    size = int(np.prod(shape))*np.dtype(dtype).itemsize
+    return shared_memory.SharedMemory(create=True, size=max(size, 1))
+
+
+def _view(memory, shape, dtype):
+    """Return an array of the shape and dtype viewing shared memory."""
+    return np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def _start(wisdom):
+    """Load the saved plans (if any) when a worker process starts."""
+    if wisdom is not None:
+        plans.load_wisdom(wisdom)
+
+
+def _work(task):
+    """Transform the signals start to stop of the batch in shared memory
+    and write them into the shared result.
+    """
+    (name, args, kwargs, source, dtype, shape, result, out_dtype, out_shape,
+     start, stop) = task
+    function, ndim, _ = transforms[name]
+    source = shared_memory.SharedMemory(name=source)
+    result = shared_memory.SharedMemory(name=result)
+    try:
+        signals = _view(source, shape, dtype)[start:stop]
+        out = _view(result, out_shape, out_dtype)[start:stop]
+        function(signals, *args, **dict(kwargs, out=out, **_axes(ndim)))
+        del signals, out
+    finally:
+        source.close()
+        result.close()
+
+
+def _axes(ndim):
+    """Return the keyword argument of the axes along which each signal
+    of a batch of ndim-dimensional signals lies.
+    """
+    return {'axis': 1} if ndim == 1 else {'axes': (1, 2)}
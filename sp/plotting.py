@@ -3,75 +3,235 @@ transformations into other bases.
 """
 
 
-import itertools
+import collections
 
 import matplotlib.pyplot as plt
 import matplotlib.patheffects as path_effects
 import numpy as np
 
 from . import bases
+from .utils import coroutine
 
 
-def coroutine(func):
-    """A coroutine decorator for calling the initial 'next' function
-    automatically.
-    """
-    def start(*args, **kwargs):
-        g = func(*args, **kwargs)
-        next(g)
-        return g
-    return start
+# The number of cells of a heatmap up to which they are annotated.
+ANNOTATE_CELLS = 1024
 
 
 @coroutine
-def plot(signal, grid=False):
+def plot(signal, grid=False, live=False, history=None):
     """Plot the signal. New signals can be sent to this coroutine via
-    the coroutine's send method.
+    the coroutine's send method. Each new 1-dimensional signal is drawn
+    over the previous ones and each new 2-dimensional signal beside
+    them, keeping only the latest history of them (if given). If live,
+    the artists are reused instead: each new signal replaces the
+    previous one (which, with the history - 1 before it, is kept faded
+    behind it) and only these artists are redrawn (blitted). Long
+    signals are decimated to the width of the axes in pixels.
     """
     plt.ion()
     fig = plt.figure()
     dimensions = len(signal.shape)
-    ax = fig.add_subplot(1, 1, 1)
-    ax.grid(grid)
-    first = True
+    view = (LivePlot if live else OverlayPlot)(fig, dimensions, grid, history)
     while True:
         if len(signal.shape) == dimensions:
-            if signal.dtype == np.complex128:
+            if np.iscomplexobj(signal):
                 signal = signal.real
-            if dimensions == 1:
-                ax.set_xlabel('Dimension')
-                ax.set_ylabel('Value')
-                ax.plot(np.arange(len(signal)), signal)
-            if dimensions == 2:
-                if first:
-                    first = False
-                else:
-                    n = len(fig.axes)
-                    for i in range(n):
-                        fig.axes[i].change_geometry(1, n+1, i+1)
-                    ax = fig.add_subplot(1, n+1, n+1)
-                ax.imshow(signal, cmap='Greys')
-            fig.canvas.draw()
+            view.update(signal)
         else:
             print("You're trying to plot a {}-dimensional signal on a plot for a {}-dimensional signal.".format(len(signal.shape), dimensions))
         signal = (yield)
 
 
-def plot_wavelet_heatmap(signal, family):
+class OverlayPlot:
+    """A plot drawing each new 1-dimensional signal over the previous
+    ones, or each new 2-dimensional signal beside them, keeping only the
+    latest history of them (if given).
+    """
+
+    def __init__(self, fig, dimensions, grid=False, history=None):
+        self.fig = fig
+        self.dimensions = dimensions
+        self.grid = grid
+        self.history = history
+        self.artists = collections.deque()
+        if dimensions == 1:
+            self.ax = fig.add_subplot(1, 1, 1)
+            self.ax.grid(grid)
+            self.ax.set_xlabel('Dimension')
+            self.ax.set_ylabel('Value')
+
+    def update(self, signal):
+        """Draw the signal."""
+        if self.dimensions == 1:
+            line, = self.ax.plot(*decimate(signal, columns(self.ax)))
+            self.artists.append(line)
+        if self.dimensions == 2:
+            ax = self.fig.add_subplot(1, 1, 1)
+            ax.grid(self.grid)
+            ax.imshow(signal, cmap='Greys')
+            self.artists.append(ax)
+        if self.history and len(self.artists) > self.history:
+            self.artists.popleft().remove()
+        if self.dimensions == 2:
+            layout = self.fig.add_gridspec(1, len(self.artists))
+            for i, ax in enumerate(self.artists):
+                ax.set_subplotspec(layout[0, i])
+        self.fig.canvas.draw()
+
+
+class LivePlot:
+    """A plot reusing its artists for each new signal, which replaces
+    the previous one. A 1-dimensional signal is drawn over the previous
+    history - 1 signals (if given), which are faded, in a line and a
+    band artist each. The background is drawn once (and again only when
+    the limits grow or the figure is resized), after which only the
+    artists are redrawn and blitted.
+    """
+
+    def __init__(self, fig, dimensions, grid=False, history=None):
+        self.fig = fig
+        self.dimensions = dimensions
+        self.history = history or 1
+        self.canvas = fig.canvas
+        self.blit = self.canvas.supports_blit
+        self.background = None
+        self.artists = []
+        self.frames = collections.deque(maxlen=self.history)
+        self.ax = fig.add_subplot(1, 1, 1)
+        self.ax.grid(grid)
+        if dimensions == 1:
+            self.ax.set_xlabel('Dimension')
+            self.ax.set_ylabel('Value')
+        if self.blit:
+            self.canvas.mpl_connect('draw_event', self._capture)
+
+    def update(self, signal):
+        """Draw the signal, blitting it if the limits still hold."""
+        if self.dimensions == 1:
+            redraw = self._line(signal)
+        else:
+            redraw = self._image(signal)
+        if redraw or not self.blit or self.background is None:
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            self._draw()
+        self.canvas.blit(self.fig.bbox)
+        self.canvas.flush_events()
+
+    def _capture(self, event):
+        """Store the drawn background and draw the artists over it."""
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw()
+
+    def _draw(self):
+        """Draw the artists, oldest first."""
+        for artist in reversed(self.artists):
+            self.ax.draw_artist(artist)
+
+    def _line(self, signal):
+        """Shift the history along the artists and draw the signal as
+        the newest: as a line or, if decimated, as the band between the
+        minimum and maximum of each column (which is far cheaper to
+        draw). Return whether the limits had to grow.
+        """
+        x, y = decimate(signal, columns(self.ax))
+        if len(y) < len(signal):
+            band = np.concatenate([np.stack([x[1::2], y[1::2]], axis=1),
+                                   np.stack([x[-2::-2], y[-2::-2]], axis=1)])
+            self.frames.appendleft((([], []), [band]))
+        else:
+            self.frames.appendleft(((x, y), []))
+        while len(self.artists) < 2*len(self.frames):
+            age = len(self.artists)//2
+            line, = self.ax.plot([], [], animated=self.blit,
+                                 color=self.artists[0].get_color() if age else None,
+                                 alpha=1 - age/self.history)
+            band = self.ax.fill_between([], [], [], animated=self.blit,
+                                        color=line.get_color(), linewidth=1,
+                                        alpha=1 - age/self.history)
+            self.artists.extend([line, band])
+        for (data, verts), line, band in zip(self.frames, self.artists[0::2],
+                                             self.artists[1::2]):
+            line.set_data(*data)
+            band.set_verts(verts)
+        if not len(y):
+            return False
+        low, high = float(np.min(y)), float(np.max(y))
+        bottom, top = self.ax.get_ylim()
+        length = max(len(signal) - 1, 1)
+        if self.background is not None:
+            if bottom <= low and high <= top and self.ax.get_xlim() == (0, length):
+                return False
+            low, high = min(low, bottom), max(high, top)
+        margin = 0.05*(high - low) or 1
+        self.ax.set_xlim(0, length)
+        self.ax.set_ylim(low - margin, high + margin)
+        return True
+
+    def _image(self, signal):
+        """Set the image to the signal. Return whether the shape (and
+        so the limits) changed.
+        """
+        if not self.artists:
+            self.artists.append(self.ax.imshow(signal, cmap='Greys',
+                                               animated=self.blit))
+            return True
+        image = self.artists[0]
+        reshaped = image.get_array().shape != signal.shape
+        image.set_data(signal)
+        image.set_clim(np.min(signal), np.max(signal))
+        if reshaped:
+            rows, cols = signal.shape
+            image.set_extent((-0.5, cols - 0.5, rows - 0.5, -0.5))
+            self.ax.set_xlim(-0.5, cols - 0.5)
+            self.ax.set_ylim(rows - 0.5, -0.5)
+        return reshaped
+
+
+def columns(ax):
+    """Return the width of the axes in pixels."""
+    return max(int(ax.get_window_extent().width), 1)
+
+
+def decimate(signal, columns):
+    """Return the positions and values of the signal (length m) reduced
+    to the minimum and maximum of each of the columns bins, interleaved,
+    so that a line through them draws the same envelope at that width.
+    A signal no longer than 2*columns is returned as it is.
+    """
+    signal = np.asarray(signal)
+    m = len(signal)
+    if m <= 2*columns:
+        return np.arange(m), signal
+    edges = np.linspace(0, m, columns + 1).astype(int)
+    values = np.empty(2*columns, dtype=signal.dtype)
+    values[0::2] = np.minimum.reduceat(signal, edges[:-1])
+    values[1::2] = np.maximum.reduceat(signal, edges[:-1])
+    return np.repeat((edges[:-1] + edges[1:] - 1)/2, 2), values
+
+
+def plot_wavelet_heatmap(signal, family, annotate=None):
     """Plot a heatmap of amplitudes of wavelets for each wavelet
-    dilation across length of signal.
+    dilation across length of signal. The amplitudes are written in
+    the cells if annotate or, by default, if there are no more than
+    ANNOTATE_CELLS of them.
     """
     matrix = bases.wavelets.heatmap_matrix(signal, family)
     m, n = matrix.shape
+    if annotate is None:
+        annotate = m*n <= ANNOTATE_CELLS
     fig, ax = plt.subplots()
-    im = ax.imshow(matrix, cmap='Greys')
+    im = ax.imshow(matrix, cmap='Greys', interpolation='nearest',
+                   aspect='equal' if annotate else 'auto')
     ax.set_title('Amplitudes with Dimensions versus Dilation/Frequency')
     ax.set_xlabel('Dilation/Frequency')
     ax.set_ylabel('Dimension')
-    for i, j in itertools.product(range(m), range(n)):
-        text = ax.text(j, i, round(matrix[i, j], 2), ha="center", va="center", color="w")
-        text.set_path_effects([path_effects.Stroke(linewidth=1, foreground='black'),
-                               path_effects.Normal()])
+    if annotate:
+        effects = [path_effects.Stroke(linewidth=1, foreground='black'),
+                   path_effects.Normal()]
+        for (i, j), value in np.ndenumerate(np.round(matrix, 2)):
+            ax.text(j, i, value, ha="center", va="center", color="w",
+                    path_effects=effects)
     fig.tight_layout()
     plt.show()
-    
\ No newline at end of file
@@ -0,0 +1,296 @@
+"""This module provides an asyncio service that transforms many small,
+independent signals. Concurrent requests for the same transform of
+signals of the same shape and type are coalesced into a batch (within a
+latency window, or once the batch is full), which is transformed in an
+executor in one vectorized call, and each request is resolved with its
+own slice of the result. The module's transform function uses a default
+service of the running event loop. The service can also be served over
+a local socket for clients in other processes or languages.
+"""
+
+
+import asyncio
+import json
+import struct
+import weakref
+
+import numpy as np
+
+from . import instrumentation
+from .parallel import transforms
+
+
+# The lengths of the JSON header and the body of each message sent over
+# a socket, as two big-endian unsigned 32-bit integers.
+PREFIX = struct.Struct('>II')
+
+# The default service of each running event loop (see default).
+_services = weakref.WeakKeyDictionary()
+
+
+class Service:
+    """A transform service coalescing concurrent requests into batches
+    of up to batch signals, each dispatched window seconds after its
+    first request (or as soon as it is full). Up to pending requests are
+    admitted at once; further requests wait for a slot (backpressure).
+    The batches are transformed in the threads of executor (by default,
+    those of the event loop), or across the worker processes of a
+    sp.parallel.Executor, pool, if given.
+    """
+
+    def __init__(self, window=0.001, batch=256, pending=10000, executor=None,
+                 pool=None):
+        self.window = window
+        self.batch = batch
+        self.pending = pending
+        self.executor = executor
+        self.pool = pool
+        # The slots are created on first use, in the running loop: on
+        # Python 3.8 and 3.9 a Semaphore binds to the loop current when
+        # it is created.
+        self.slots = None
+        self.queues = {}
+        self.timers = {}
+        self.tasks = set()
+        self.admitted = 0
+        self.queued = 0
+        self.running = 0
+        self.requests = 0
+        self.batches = 0
+        self.latency = instrumentation.Timings()
+
+    async def transform(self, name, signal, *args):
+        """Return the transform (named as in sp.parallel.transforms) of
+        the signal, with the further arguments given (e.g. the wavelet
+        family), once the batch it joins has been transformed.
+        """
+        await self._admit()
+        try:
+            return await self._submit(name, signal, args)
+        finally:
+            self._release()
+
+    async def drain(self):
+        """Dispatch every queued batch and wait until all of them have
+        been transformed.
+        """
+        for key in list(self.queues):
+            self._flush(key)
+        while self.tasks:
+            await asyncio.gather(*self.tasks)
+
+    def stats(self):
+        """Return a snapshot of the metrics of the service: the number of
+        requests admitted (pending), waiting to be dispatched (queued)
+        and being transformed (running), the totals of requests and
+        batches, the mean size of a batch and the latency of the requests
+        (see sp.instrumentation.Timings.summary).
+        """
+        return {'pending': self.admitted, 'queued': self.queued,
+                'running': self.running, 'requests': self.requests,
+                'batches': self.batches,
+                'batch': self.requests/self.batches if self.batches else 0.0,
+                'latency': self.latency.summary() if self.latency.calls else None}
+
+    async def serve(self, host='127.0.0.1', port=0, path=None):
+        """Return an asyncio server of the service on a TCP port of the
+        host (by default, any free port of the loopback interface) or, if
+        a path is given, on a Unix socket. See read_message for the
+        protocol.
+        """
+        if path is not None:
+            return await asyncio.start_unix_server(self._handle, path)
+        return await asyncio.start_server(self._handle, host, port)
+
+    async def _admit(self):
+        """Wait for a slot for a request."""
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.pending)
+        await self.slots.acquire()
+        self.admitted += 1
+
+    def _release(self):
+        """Free the slot of a request."""
+        self.admitted -= 1
+        self.slots.release()
+
+    async def _submit(self, name, signal, args):
+        """Queue the signal to be transformed in the next batch of its
+        kind and return its slice of the transform of the batch.
+        """
+        if name not in transforms:
+            raise NotImplementedError('{} transform is not implemented.'.format(name))
+        signal = np.asarray(signal)
+        if signal.ndim != transforms[name][1]:
+            raise ValueError('Signal is not {}-dimensional.'.format(transforms[name][1]))
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (name, tuple(args), signal.shape, signal.dtype.str)
+        queue = self.queues.setdefault(key, [])
+        queue.append((signal, future, loop.time()))
+        self.queued += 1
+        if len(queue) >= self.batch:
+            self._flush(key)
+        elif len(queue) == 1:
+            self.timers[key] = loop.call_later(self.window, self._flush, key)
+        return await future
+
+    def _flush(self, key):
+        """Dispatch the queued batch of the kind, key."""
+        timer = self.timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        requests = self.queues.pop(key, None)
+        if requests:
+            task = asyncio.get_running_loop().create_task(self._run(key, requests))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, key, requests):
+        """Transform the batch of requests in the executor and resolve
+        each request with its slice of the result (or the error raised).
+        """
+        name, args, _, _ = key
+        loop = asyncio.get_running_loop()
+        count = len(requests)
+        self.queued -= count
+        self.running += count
+        self.requests += count
+        self.batches += 1
+        instrumentation.count('service.requests', count)
+        instrumentation.count('service.batches')
+        try:
+            signals = np.stack([signal for signal, _, _ in requests])
+            result = await loop.run_in_executor(self.executor, self._transform,
+                                                name, signals, args)
+        except Exception as error:
+            for _, future, _ in requests:
+                if not future.done():
+                    future.set_exception(error)
+        else:
+            for i, (_, future, _) in enumerate(requests):
+                if not future.done():
+                    future.set_result(result[i])
+        finally:
+            self.running -= count
+            now = loop.time()
+            for _, _, start in requests:
+                self.latency.add(now - start)
+
+    def _transform(self, name, signals, args):
+        """Return the transform of each signal of the batch."""
+        if self.pool is not None:
+            return self.pool.transform(name, signals, *args)
+        function, ndim, _ = transforms[name]
+        axes = {'axis': -1} if ndim == 1 else {'axes': (-2, -1)}
+        return function(signals, *args, **axes)
+
+    async def _handle(self, reader, writer):
+        """Serve the requests of a connection, replying to each (tagged
+        with the id of its request) as soon as it is transformed, so
+        that a client may send many requests before reading the replies.
+        """
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    message = await read_message(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                await self._admit()
+                task = asyncio.create_task(self._reply(message, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+    async def _reply(self, message, writer, lock):
+        """Transform the signal of a request and write the reply."""
+        header, body = message
+        try:
+            header = json.loads(header)
+            signal = np.frombuffer(body, dtype=header['dtype']).reshape(header['shape'])
+            result = await self._submit(header['name'], signal,
+                                        tuple(header.get('args', ())))
+            reply = {'id': header.get('id')}
+        except Exception as error:
+            result = None
+            reply = {'id': header.get('id') if isinstance(header, dict) else None,
+                     'error': '{}: {}'.format(type(error).__name__, error)}
+        finally:
+            self._release()
+        async with lock:
+            write_message(writer, reply, result)
+            await writer.drain()
+
+
+async def transform(signal, family):
+    """Return the coefficients of a 1 or 2-dimensional signal in the
+    basis of the family ('Fourier' or a wavelet family), as
+    sp.compression.transform does, transformed by the default service of
+    the running loop in a batch with concurrent requests of its kind.
+    """
+    signal = np.asarray(signal)
+    if signal.ndim not in (1, 2):
+        raise ValueError('Signal is not 1 or 2-dimensional.')
+    if family.lower() == 'fourier':
+        name, args = ('ifft', 'idft2')[signal.ndim - 1], ()
+    else:
+        name, args = ('idwt', 'idwt2')[signal.ndim - 1], (family,)
+    return await default().transform(name, signal, *args)
+
+
+def default():
+    """Return the default service of the running event loop, created
+    with the default settings on first use.
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _services:
+        _services[loop] = Service()
+    return _services[loop]
+
+
+async def read_message(reader):
+    """Return the header (as JSON) and the body (as bytes) of a message
+    read from the stream: the lengths of the two (see PREFIX) followed by
+    them. A request's header holds the name of the transform, its
+    further arguments (args, optional), the dtype (as in numpy's
+    dtype.str) and shape of the signal, whose samples in C order are the
+    body, and optionally an id. A reply's header holds the id of its
+    request and either the dtype and shape of the transform, whose
+    coefficients are the body, or an error. Raise an
+    asyncio.IncompleteReadError if the stream ends first.
+    """
+    header, body = PREFIX.unpack(await reader.readexactly(PREFIX.size))
+    return await reader.readexactly(header), await reader.readexactly(body)
+
+
+def write_message(writer, header, array=None):
+    """Write a message of the header (a dictionary) and the array (if
+    any), whose dtype and shape are added to the header, to the stream.
+    See read_message.
+    """
+    body = b''
+    if array is not None:
+        array = np.ascontiguousarray(array)
+        header = dict(header, dtype=array.dtype.str, shape=list(array.shape))
+        body = array.tobytes()
+    header = json.dumps(header).encode()
+    writer.write(PREFIX.pack(len(header), len(body)) + header + body)
+
+
+async def request(reader, writer, name, signal, *args):
+    """Return the transform of the signal requested from a service over
+    the stream of a connection to it. Raise a RuntimeError with the
+    message of the service if it fails.
+    """
+    write_message(writer, {'name': name, 'args': list(args)}, signal)
+    await writer.drain()
+    header, body = await read_message(reader)
+    header = json.loads(header)
+    if 'error' in header:
+        raise RuntimeError(header['error'])
+    return np.frombuffer(body, dtype=header['dtype']).reshape(header['shape'])
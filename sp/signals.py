@@ -7,81 +7,125 @@ import itertools
 
 import numpy as np
 
+from .instrumentation import instrumented
 
-def sum_of_sinusoids(m, amps_freqs):
+
+@instrumented
+def sum_of_sinusoids(m, amps_freqs, dtype=float, out=None):
     """Return a 1-dimensional signal comprised of a sum of cosines.
     The variable amps_freqs is a list of lists of amplitude and frequency
     (in radians) for each cosine. Therefore the length of amsp_freqs is 
-    the number of cosines being summed.
+    the number of cosines being summed. A batch of lists (batch by
+    cosines by 2) gives a batch of signals (batch by m). The signal is
+    written into out if given. The cosines are added one at a time.
     """
-    s = np.zeros(m)
-    for amp, freq in amps_freqs:
-        s += amp*np.cos(2*np.pi*freq*1/m*np.arange(0, m))
+    amps_freqs = np.asarray(amps_freqs, dtype=float)
+    if amps_freqs.ndim == 1:
+        amps_freqs = amps_freqs.reshape(-1, 2)
+    s = _output(amps_freqs.shape[:-2] + (m,), dtype, out)
+    work = _working(s)
+    samples = np.arange(0, m, dtype=work)
+    cosine = np.empty(amps_freqs.shape[:-2] + (m,), dtype=work)
+    s[...] = 0
+    for i in range(amps_freqs.shape[-2]):
+        amps, freqs = amps_freqs[..., i, 0, None], amps_freqs[..., i, 1, None]
+        np.multiply((2*np.pi*freqs*1/m).astype(work), samples, out=cosine)
+        np.cos(cosine, out=cosine)
+        cosine *= amps.astype(work)
+        s += cosine
     return s
 
 
-def square_signal(m):
+@instrumented
+def square_signal(m, dtype=float, out=None):
     """Return a 1-dimensional square wave of length 'm'.
     """
-    s = np.zeros(m)
-    s[int(m/4):int(3*m/4)] = 1
+    s = _output((m,), dtype, out)
+    s[...] = 0
+    s[..., int(m/4):int(3*m/4)] = 1
     return s
 
 
-def chequered(m, n, t):
+@instrumented
+def chequered(m, n, t, dtype=float, out=None):
     """Return a 2-dimensional array (m by n) of black and white
-    chequers of thickness, t.
+    chequers of thickness, t. A batch of thicknesses gives a batch of
+    arrays (batch by m by n).
     """
-    s = np.zeros((m, n))
-    mchunks = list(chunks(range(m), t))
-    nchunks = list(chunks(range(n), t))
-    for i, mchunk in enumerate(mchunks):
-        for j, nchunk in enumerate(nchunks):
-            if (i%2 == 0 and j%2 != 0) or (i%2 != 0 and j%2 == 0):
-                s[mchunk[0]:mchunk[-1]+1, nchunk[0]:nchunk[-1]+1] = 255
+    t = np.asarray(t)[..., None, None]
+    rows, cols = np.arange(m)[:, None]//t, np.arange(n)//t
+    s = _output(t.shape[:-2] + (m, n), dtype, out)
+    np.not_equal(rows % 2, cols % 2, out=s, casting='unsafe')
+    s *= 255
     return s
 
 
-def stripes(m, n, t, vertical=True):
+@instrumented
+def stripes(m, n, t, vertical=True, dtype=float, out=None):
     """Return a 2-dimensional array of black and white stripes, either
-    horizontal or vertical.
+    horizontal or vertical. Only the first two stripes (of thickness t)
+    are white. A batch of thicknesses gives a batch of arrays (batch by
+    m by n).
     """
-    s = np.zeros((m, n))
-    flag = True
+    t = np.asarray(t)[..., None, None]
     if vertical:
-        for i, chunk in enumerate(chunks(range(n), t)):
-            if i//2 == 0:
-                s[:, chunk] = 255
+        white = np.arange(n)//t//2 == 0
     else:
-        for i, chunk in enumerate(chunks(range(m), t)):
-            if i//2 == 0:
-                s[chunk, :] = 255
+        white = np.arange(m)[:, None]//t//2 == 0
+    s = _output(white.shape[:-2] + (m, n), dtype, out)
+    s[...] = white
+    s *= 255
     return s
 
 
-def sinusoids_2d(m, n, f):
+@instrumented
+def sinusoids_2d(m, n, f, dtype=float, out=None):
     """Return a 2-dimensional array (m by n) of a sinusoid of amplitude
     of 1, frequency of f (in radians) and length of m, repeated n number
-    of times.
+    of times. A batch of frequencies gives a batch of arrays (batch by m
+    by n).
     """
-    s = np.cos(2*np.pi*f*1/m*np.arange(0, m))   
-    return np.tile(s, (n, 1)).T
+    f = np.asarray(f, dtype=float)[..., None, None]
+    s = _output(f.shape[:-2] + (m, n), dtype, out)
+    s[...] = np.cos(2*np.pi*f*1/m*np.arange(0, m)[:, None])
+    return s
 
 
-def vertical_sinusoids(m, n, f):
+@instrumented
+def vertical_sinusoids(m, n, f, dtype=float, out=None):
     """Return a 2-dimensional array (m by n) of a sinusoid of amplitude
     of 1, frequency of f (in radians) and length of m, repeated n number
     of times.
     """
-    return sinusoids_2d(m, n, f)
+    return sinusoids_2d(m, n, f, dtype, out)
 
 
-def horizontal_sinusoids(m, n, f):
+@instrumented
+def horizontal_sinusoids(m, n, f, dtype=float, out=None):
     """Return a 2-dimensional array (m by n) of a sinusoid of amplitude
     of 1, frequency of f (in radians) and length of m, repeated n number
     of times.
     """
-    return sinusoids_2d(n, m, f).T
+    f = np.asarray(f, dtype=float)
+    s = _output(f.shape + (m, n), dtype, out)
+    sinusoids_2d(n, m, f, out=np.swapaxes(s, -1, -2))
+    return s
+
+
+def _output(shape, dtype, out):
+    """Return out if given, else a new (uninitialised) array of the
+    shape and dtype, for a signal to be written into.
+    """
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    return out
+
+
+def _working(s):
+    """Return the dtype in which the samples of the signal, s, are
+    computed: its own if it is floating point or complex, else float64.
+    """
+    return s.dtype if s.dtype.kind in 'fc' else np.dtype(float)
 
 
 def chunks(a_list, n):
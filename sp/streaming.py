@@ -0,0 +1,119 @@
+"""This module provides the functionality to transform signals that
+arrive as a stream of chunks, using a fixed amount of memory however
+long the stream is.
+"""
+
+
+import numpy as np
+
+from .bases import batch, fourier
+from .bases.wavelets import Haar
+from .utils import coroutine
+
+
+@coroutine
+def stft(m, hop=None, window=None, dtype=None):
+    """Compute the short-time Fourier transform of a stream. Chunks of
+    any length can be sent to this coroutine via its send method, which
+    returns the short-time Fourier coefficients (frames by m) of the
+    frames completed by the chunk. Only the samples of the next
+    (incomplete) frame are kept between chunks, in a buffer of m samples
+    plus the longest chunk so far, into which each chunk is copied. The
+    coefficients are computed in the precision of dtype if given, else
+    of the samples. See fourier.stft.
+    """
+    hop = hop or max(m // 2, 1)
+    buffer = np.zeros(m)
+    filled = 0
+    skip = 0
+    frames = None
+    while True:
+        chunk = np.asarray((yield frames))
+        drop = min(skip, len(chunk))
+        skip -= drop
+        chunk = chunk[drop:]
+        n = filled + len(chunk)
+        kind = np.result_type(buffer, chunk)
+        if n > len(buffer) or kind != buffer.dtype:
+            grown = np.empty(m + len(chunk), dtype=kind)
+            grown[:filled] = buffer[:filled]
+            buffer = grown
+        buffer[filled:n] = chunk
+        frames = fourier.stft(buffer[:n], m, hop, window, dtype)
+        start = len(frames)*hop
+        skip += max(start - n, 0)
+        filled = max(n - start, 0)
+        buffer[:filled] = buffer[start:n]
+
+
+def stft_frames(chunks, m, hop=None, window=None, dtype=None):
+    """Yield the short-time Fourier coefficients of each frame of a
+    stream of chunks as soon as the frame is complete.
+    """
+    transform = stft(m, hop, window, dtype)
+    for chunk in chunks:
+        for frame in transform.send(chunk):
+            yield frame
+
+
+class HaarDecomposer:
+    """Decompose a stream into Haar wavelet coefficients as its samples
+    arrive. Each level keeps only its unpaired approximation, so memory
+    is O(log n) and each sample costs amortised O(1). The detail
+    coefficients of a level are emitted as soon as both halves of their
+    support have arrived. The coefficients are computed in the
+    precision of dtype if given, else of the samples (at least single
+    precision).
+    """
+
+    def __init__(self, dtype=None):
+        self.dtype = dtype
+        self.reset()
+
+    def reset(self):
+        """Forget all the samples received."""
+        self.pending = []
+        self.counts = []
+
+    def snapshot(self):
+        """Return a copy of the decomposer in its current state."""
+        copy = HaarDecomposer(self.dtype)
+        copy.pending = list(self.pending)
+        copy.counts = list(self.counts)
+        return copy
+
+    def update(self, samples):
+        """Add the samples to the stream and return a list of (level,
+        index, details) for the detail coefficients completed by them,
+        from the finest level (1) to the coarsest. The details of level j
+        at index k are those of the wavelets spanning samples k*2**j to
+        (k+1)*2**j of the stream.
+        """
+        data = batch.cast(np.asarray(samples), self.dtype)
+        finished = []
+        level = 0
+        while len(data):
+            if level == len(self.pending):
+                self.pending.append(None)
+                self.counts.append(0)
+            if self.pending[level] is not None:
+                data = np.concatenate([[self.pending[level]], data])
+            n = len(data) - len(data) % 2
+            self.pending[level] = data[-1] if n < len(data) else None
+            if n == 0:
+                break
+            halves = Haar.ilift(data[:n], levels=1)
+            finished.append((level + 1, self.counts[level], halves[n//2:]))
+            self.counts[level] += n//2
+            data = halves[:n//2]
+            level += 1
+        return finished
+
+    def approximation(self):
+        """Return the approximation coefficient of the whole stream,
+        whose length must be a power of two. Else raise a ValueError.
+        """
+        if sum(a is not None for a in self.pending) != 1 or \
+                self.pending[-1] is None:
+            raise ValueError("The length of the stream must be a power of two.")
+        return self.pending[-1]
@@ -0,0 +1,12 @@
+"""This module provides small utilities shared by the other modules."""
+
+
+def coroutine(func):
+    """A coroutine decorator for calling the initial 'next' function
+    automatically.
+    """
+    def start(*args, **kwargs):
+        g = func(*args, **kwargs)
+        next(g)
+        return g
+    return start
@@ -2,11 +2,23 @@
 signal processing functions.
 """
 
+import asyncio
+import concurrent.futures
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
 import unittest
+from unittest import mock
 
 import numpy as np
 
-from sp import bases, signals
+import sp
+from sp import (bases, compression, filtering, outofcore, parallel, service,
+                signals, streaming)
 
 
 class FourierTests(unittest.TestCase):
@@ -40,6 +52,31 @@ class FourierTests(unittest.TestCase):
         synthesised = bases.fourier.dft(coeffs)
         np.testing.assert_almost_equal(original.real, synthesised.real)
 
+    def test_real_transform_is_half_spectrum(self):
+        """Test if the real-input transform gives the first m//2 + 1
+        coefficients of the complex transform, for even and odd lengths,
+        and if the synthesis gives the real signal back.
+        """
+        for m in (16, 30, 17):
+            original = signals.sum_of_sinusoids(m, [[10, 5], [5, 8]])
+            coeffs = bases.fourier.irfft(original)
+            np.testing.assert_almost_equal(
+                coeffs, bases.fourier.ifft(original)[:m//2 + 1])
+            synthesised = bases.fourier.rfft(coeffs, m)
+            self.assertFalse(np.iscomplexobj(synthesised))
+            np.testing.assert_almost_equal(synthesised, original)
+
+    def test_real_transform_2d(self):
+        """Test if the 2-dimensional real-input transform gives the
+        non-redundant columns of idft2 and is inverted by rfft2.
+        """
+        image = np.random.rand(3, 8, 6)
+        coeffs = bases.fourier.irfft2(image, axes=(1, 2))
+        np.testing.assert_almost_equal(
+            coeffs, bases.fourier.idft2(image, axes=(1, 2))[..., :4])
+        np.testing.assert_almost_equal(
+            bases.fourier.rfft2(coeffs, axes=(1, 2)), image)
+
     def test_diag_inverse_is_transpose(self):
         """Test if the inverse of the Fourier matrix (Diagonal only) is
         the same as the transpose of the complex conjugate of the
@@ -62,10 +99,133 @@ class FourierTests(unittest.TestCase):
             bases.fourier.idft2(one_dimen)
             bases.fourier.dft2(one_dimen)
 
+    def test_fft_matches_dft(self):
+        """Test if the Fast Fourier Transform (and its inverse) gives
+        the same result as the matrix versions for power-of-two,
+        mixed-radix and prime lengths.
+        """
+        for m in [1, 2, 16, 64, 12, 30, 100, 17, 97, 202]:
+            signal = np.random.rand(m) + 1j*np.random.rand(m)
+            np.testing.assert_almost_equal(bases.fourier.fft(signal),
+                                           bases.fourier.dft(signal))
+            np.testing.assert_almost_equal(bases.fourier.ifft(signal),
+                                           bases.fourier.idft(signal))
+
+    def test_fft_analysis_and_synthesis(self):
+        """Test if a long 1-dimensional signal is synthesised back to
+        its original after analysis with the Fast Fourier Transform.
+        """
+        original = signals.sum_of_sinusoids(4096, [[10, 5], [5, 80]])
+        coeffs = bases.fourier.ifft(original)
+        synthesised = bases.fourier.fft(coeffs)
+        np.testing.assert_almost_equal(original, synthesised.real)
+
+    def test_plan_matches_dft(self):
+        """Test if a Fourier plan's execute and inverse methods give the
+        same results as idft and dft.
+        """
+        for m in [8, 30, 17]:
+            signal = np.random.rand(m)
+            plan = bases.fourier.plan(m)
+            coeffs = plan.execute(signal)
+            np.testing.assert_almost_equal(coeffs, bases.fourier.idft(signal))
+            np.testing.assert_almost_equal(plan.inverse(coeffs),
+                                           bases.fourier.dft(coeffs))
+        self.assertIs(bases.fourier.plan(30), bases.fourier.plan(30))
+        with self.assertRaises(ValueError):
+            bases.fourier.plan(30).execute(np.zeros(31))
+
+    def test_idft_bins_match_idft(self):
+        """Test if the coefficients at a few bins are the same as those
+        entries of idft, for a signal and a stack of signals.
+        """
+        signal = signals.sum_of_sinusoids(64, [[3, 17], [8, 26], [2, 29]])
+        bins = [17, 26, 29, 3]
+        np.testing.assert_almost_equal(bases.fourier.idft_bins(signal, bins),
+                                       bases.fourier.idft(signal)[bins])
+        stack = np.random.rand(64, 3)
+        np.testing.assert_almost_equal(
+            bases.fourier.idft_bins(stack, bins, axis=0),
+            bases.fourier.idft(stack, axis=0)[bins])
+
+    def test_idft_bins_memory(self):
+        """Test that the coefficients at a few bins of a long signal are
+        computed without building the rows for every sample at once.
+        """
+        m, bins = 2**18, [1, 5, 9, 2**17]
+        signal = np.random.rand(m)
+        tracemalloc.start()
+        coeffs = bases.fourier.idft_bins(signal, bins)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertLess(peak, m*8)
+        np.testing.assert_almost_equal(coeffs, bases.fourier.irfft(signal)[bins])
+
+    def test_sliding_dft_matches_idft(self):
+        """Test if the sliding DFT's coefficients of each window of a
+        stream sent in chunks are the same as those entries of idft.
+        """
+        signal = np.random.rand(100)
+        bins = [0, 3, 7]
+        sliding = bases.fourier.SlidingDFT(16, bins)
+        coeffs = np.concatenate([sliding.update(chunk) for chunk in
+                                 np.split(signal, [10, 11, 11, 50])])
+        for t in [15, 16, 40, 99]:
+            window = signal[t-15:t+1]
+            np.testing.assert_almost_equal(coeffs[t],
+                                           bases.fourier.idft(window)[bins])
+
+    def test_sliding_dft_does_not_drift(self):
+        """Test that the coefficients of a long stream, sent in long and
+        short updates, stay those of the last window to within 1e-12.
+        """
+        bins = [1, 5, 17]
+        signal = np.random.randn(300000)
+        sliding = bases.fourier.SlidingDFT(64, bins)
+        for chunk in np.split(signal, [200000, 200001, 250000]):
+            coeffs = sliding.update(chunk)
+        np.testing.assert_allclose(coeffs[-1],
+                                   bases.fourier.idft(signal[-64:])[bins],
+                                   rtol=0, atol=1e-12)
+        self.assertEqual(sliding.update(signal[:3]).shape, (3, 3))
+
+    def test_sliding_dft_precision(self):
+        """Test that the sliding DFT keeps the imaginary part of complex
+        samples and computes in the precision of the dtype given.
+        """
+        signal = np.random.rand(40) + 1j*np.random.rand(40)
+        sliding = bases.fourier.SlidingDFT(16, [2, 5])
+        sliding.update(signal[:20].real)
+        coeffs = sliding.update(signal[20:])
+        np.testing.assert_almost_equal(coeffs[-1],
+                                       bases.fourier.idft(signal[-16:])[[2, 5]])
+        sliding = bases.fourier.SlidingDFT(16, [2, 5], np.float32)
+        coeffs = sliding.update(signal.real)
+        self.assertEqual(coeffs.dtype, np.complex64)
+        np.testing.assert_allclose(coeffs[-1],
+                                   bases.fourier.idft(signal[-16:].real)[[2, 5]],
+                                   atol=1e-5)
+
 
 class HaarTests(unittest.TestCase):
     """Test cases for the Haar basis."""
 
+    def test_scalogram_equals_squeezed_matrix(self):
+        """Test if the scalogram is bit for bit the wavelet matrix scaled
+        by the coefficients and squeezed, for each of a batch of signals.
+        """
+        haar = bases.wavelets.Haar
+        signals_ = np.random.randn(3, 32)
+        signals_[0] = 0
+        amplitudes = bases.wavelets.scalogram(signals_, 'Haar', axis=-1)
+        self.assertEqual(amplitudes.shape, (3, 32, 6))
+        for signal, amplitude in zip(signals_, amplitudes):
+            coeffs = bases.wavelets.idwt(signal, 'Haar')
+            squeezed = haar.squeeze(np.multiply(haar.matrix(32), coeffs))
+            self.assertEqual(amplitude.tobytes(), squeezed.tobytes())
+        np.testing.assert_array_equal(
+            bases.wavelets.heatmap_matrix(signals_[1], 'Haar'), amplitudes[1])
+
     def test_wavelet_length_error(self):
         """Test if ValueError is raised if the wavelet length is greater
         than the signal length.
@@ -182,6 +342,267 @@ class HaarTests(unittest.TestCase):
                                               1/np.sqrt(2)]))
         np.testing.assert_almost_equal(squeezed, true_squeezed)
 
+    def test_lifting_matches_matrix(self):
+        """Test if the lifting transform gives the same coefficients (in
+        the same order) as the Haar matrices and reconstructs the signal.
+        """
+        for m in [1, 2, 8, 64]:
+            signal = np.random.rand(m)
+            coeffs = bases.wavelets.Haar.ilift(signal)
+            np.testing.assert_almost_equal(
+                coeffs, bases.wavelets.Haar.imatrix(m).dot(signal))
+            np.testing.assert_almost_equal(
+                bases.wavelets.Haar.lift(coeffs),
+                bases.wavelets.Haar.matrix(m).dot(coeffs))
+
+    def test_lifting_in_place_and_partial(self):
+        """Test the lifting transform writing into a buffer supplied by
+        the caller (including the signal itself) and decomposing only
+        some levels of a signal whose length is not a power of two.
+        """
+        signal = np.random.rand(24)
+        buffer = signal.copy()
+        coeffs = bases.wavelets.Haar.ilift(buffer, levels=3, out=buffer)
+        self.assertIs(coeffs, buffer)
+        np.testing.assert_almost_equal(
+            coeffs[:3], bases.wavelets.Haar.ilift(signal.reshape(3, 8))[:, 0])
+        out = np.empty(24)
+        bases.wavelets.Haar.lift(coeffs, levels=3, out=out)
+        np.testing.assert_almost_equal(out, signal)
+        with self.assertRaises(ValueError):
+            bases.wavelets.Haar.ilift(signal, levels=4)
+
+    def test_plan_matches_dwt(self):
+        """Test if a Haar plan's execute and inverse methods give the
+        same results as idwt and dwt.
+        """
+        signal = np.random.rand(16)
+        plan = bases.wavelets.plan(16, 'Haar')
+        coeffs = plan.execute(signal)
+        np.testing.assert_almost_equal(coeffs,
+                                       bases.wavelets.idwt(signal, 'Haar'))
+        np.testing.assert_almost_equal(plan.inverse(coeffs),
+                                       bases.wavelets.dwt(coeffs, 'Haar'))
+
+
+class FilterBankTests(unittest.TestCase):
+    """Test cases for the wavelet families transformed by filter banks."""
+
+    names = ['db{}'.format(n) for n in range(2, 11)] + \
+            ['sym{}'.format(n) for n in range(2, 11)]
+
+    def test_filters_are_orthonormal_wavelets(self):
+        """Test if each family's filters are orthonormal to their even
+        shifts and the wavelet has as many vanishing moments as its name
+        says. The db2 filter is checked against its closed form.
+        """
+        root3 = np.sqrt(3)
+        np.testing.assert_almost_equal(
+            bases.wavelets.get_family('db2').lowpass,
+            np.array([1 + root3, 3 + root3, 3 - root3, 1 - root3])/(4*np.sqrt(2)))
+        for name in self.names:
+            Family = bases.wavelets.get_family(name)
+            h, g = Family.lowpass, Family.highpass
+            moments = int(name.strip('dbsym'))
+            self.assertEqual(len(h), 2*moments)
+            for shift in range(0, len(h), 2):
+                np.testing.assert_almost_equal(h[shift:].dot(h[:len(h) - shift]), shift == 0)
+                np.testing.assert_almost_equal(h[shift:].dot(g[:len(g) - shift]), 0)
+            for power in range(moments):
+                k = np.arange(len(g))/len(g)
+                np.testing.assert_almost_equal(g.dot(k**power), 0)
+
+    def test_symlets_match_published_tables(self):
+        """Test if the leading taps of each symlet's low-pass synthesis
+        filter are those of the published tables.
+        """
+        published = {
+            2: [0.48296291314469025, 0.836516303737469, 0.22414386804185735],
+            3: [0.3326705529509569, 0.8068915093133388, 0.4598775021193313],
+            4: [0.0322231006040427, -0.012603967262037833, -0.09921954357684722],
+            5: [0.027333068345077982, 0.029519490925774643, -0.039134249302383094],
+            6: [-0.007800708325034148, 0.0017677118642428036, 0.04472490177066578],
+            7: [0.002681814568257878, -0.0010473848886829163, -0.01263630340325193],
+            8: [0.0018899503327594609, -0.0003029205147213668, -0.01495225833704823],
+            9: [0.0010694900329086053, -0.0004731544986800831, -0.010264064027633142],
+            10: [-0.0004593294210046588, 5.7036083618494284e-05, 0.004593173585311828]}
+        for n, taps in published.items():
+            lowpass = bases.wavelets.get_family('sym{}'.format(n)).lowpass
+            np.testing.assert_allclose(lowpass[:3], taps, rtol=0, atol=1e-10)
+        with self.assertRaises(NotImplementedError):
+            bases.wavelets.filters.symlet(11)
+
+    def test_perfect_reconstruction_in_every_mode(self):
+        """Test if a batch of signals of lengths that are not powers of
+        two (or even) is reconstructed from its coefficients in every
+        boundary mode that allows the length, and if the periodic mode
+        keeps the energy and rejects odd lengths.
+        """
+        for name in ('db2', 'db7', 'sym4'):
+            with self.assertRaises(ValueError):
+                bases.wavelets.idwt(np.ones(37), name)
+            for m in (96, 100, 37):
+                for mode in bases.wavelets.families.MODES:
+                    if mode == 'periodic' and m % 2:
+                        continue
+                    original = np.random.randn(3, m)
+                    coeffs = bases.wavelets.idwt(original, name, axis=1, mode=mode)
+                    synthesised = bases.wavelets.dwt(coeffs, name, axis=1, mode=mode, m=m)
+                    np.testing.assert_almost_equal(synthesised, original)
+                    if mode == 'periodic':
+                        self.assertEqual(coeffs.shape, original.shape)
+                        np.testing.assert_almost_equal(
+                            np.sum(coeffs**2, axis=1), np.sum(original**2, axis=1))
+
+    def test_matrix_is_orthonormal(self):
+        """Test if the wavelet matrix of a filter bank is orthonormal and
+        multiplies the coefficients to construct the signal.
+        """
+        Family = bases.wavelets.get_family('sym5')
+        matrix = Family.matrix(32)
+        np.testing.assert_almost_equal(matrix.dot(matrix.T), np.eye(32))
+        coeffs = np.random.randn(32)
+        np.testing.assert_almost_equal(matrix.dot(coeffs),
+                                       bases.wavelets.dwt(coeffs, 'sym5'))
+
+    def test_mode_errors(self):
+        """Test if an unknown mode raises a NotImplementedError and if a
+        mode other than periodic needs the signal length to reconstruct.
+        """
+        with self.assertRaises(NotImplementedError):
+            bases.wavelets.idwt(np.ones(8), 'db2', mode='reflect')
+        coeffs = bases.wavelets.idwt(np.ones(8), 'db2', mode='zero')
+        with self.assertRaises(ValueError):
+            bases.wavelets.dwt(coeffs, 'db2', mode='zero')
+
+
+class PyramidTests(unittest.TestCase):
+    """Test cases for the 2-dimensional Mallat pyramid."""
+
+    def test_in_place_reconstruction(self):
+        """Test if an image transformed in its own buffer is
+        reconstructed in that buffer, keeping its energy.
+        """
+        for family in ('Haar', 'db3'):
+            image = np.random.rand(32, 24)
+            buffer = image.copy()
+            coeffs = bases.wavelets.ipyramid(buffer, family, out=buffer)
+            self.assertIs(coeffs, buffer)
+            np.testing.assert_almost_equal(np.sum(coeffs**2), np.sum(image**2))
+            bases.wavelets.pyramid(buffer, family, out=buffer)
+            np.testing.assert_almost_equal(buffer, image)
+
+    def test_preview_is_block_mean(self):
+        """Test if the Haar preview at level k is the mean of each 2**k by
+        2**k block of the image, and if batches of images along two axes
+        are transformed alike.
+        """
+        images = np.random.rand(3, 32, 16)
+        coeffs = bases.wavelets.ipyramid(images, 'Haar', axes=(1, 2))
+        np.testing.assert_almost_equal(
+            coeffs[1], bases.wavelets.ipyramid(images[1], 'Haar'))
+        preview = bases.wavelets.pyramid(coeffs, 'Haar', level=2, axes=(1, 2))
+        np.testing.assert_almost_equal(
+            preview, images.reshape(3, 8, 4, 4, 4).mean(axis=(2, 4)))
+
+    def test_bands_tile_the_coefficients(self):
+        """Test if the documented layout covers every coefficient once and
+        places a constant image's energy in the approximation alone.
+        """
+        layout = bases.wavelets.pyramid_bands((16, 8))
+        counts = np.zeros((16, 8))
+        for level, band, index in layout:
+            counts[index] += 1
+        np.testing.assert_equal(counts, 1)
+        coeffs = bases.wavelets.ipyramid(np.ones((16, 8)), 'Haar')
+        level, band, index = layout[-1]
+        self.assertEqual((level, band), (3, 'approximation'))
+        np.testing.assert_almost_equal(np.sum(coeffs[index]**2), 16*8)
+
+
+class FilteringTests(unittest.TestCase):
+    """Test cases for convolution and filtering."""
+
+    def test_convolve_matches_numpy(self):
+        """Test if both methods (and the automatic choice) of convolution
+        and correlation match numpy's in every mode, for real and
+        complex signals shorter and longer than the kernel.
+        """
+        for n, k in [(100, 7), (7, 100), (300, 300), (2, 4), (4, 9), (4, 10),
+                     (6, 100)]:
+            for signal in (np.random.randn(n), np.random.randn(n) + 1j*np.random.randn(n)):
+                kernel = np.random.randn(k)
+                for mode in filtering.MODES:
+                    for method in filtering.METHODS:
+                        np.testing.assert_almost_equal(
+                            filtering.convolve(signal, kernel, mode, method),
+                            np.convolve(signal, kernel, mode))
+                        np.testing.assert_almost_equal(
+                            filtering.correlate(signal, kernel, mode, method),
+                            np.correlate(signal, kernel, mode))
+
+    def test_filtered_into_out(self):
+        """Test that convolutions, correlations and filtered signals are
+        written into out, of the same or of another dtype, by each method.
+        """
+        signal, kernel = np.random.rand(40, 3), np.random.rand(9)
+        for method in filtering.METHODS:
+            for dtype in (float, np.float32):
+                out = np.empty((40, 3), dtype=dtype)
+                self.assertIs(filtering.convolve(signal, kernel, 'same', method,
+                                                 axis=0, out=out), out)
+                np.testing.assert_allclose(
+                    out[:, 1], np.convolve(signal[:, 1], kernel, 'same'), atol=1e-5)
+                out = np.empty((32, 3), dtype=dtype)
+                self.assertIs(filtering.correlate(signal, kernel, 'valid', method,
+                                                  axis=0, out=out), out)
+                np.testing.assert_allclose(
+                    out[:, 2], np.correlate(signal[:, 2], kernel, 'valid'), atol=1e-5)
+                out = np.empty((40, 3), dtype=dtype)
+                self.assertIs(filtering.fir_filter(kernel, signal, method,
+                                                   axis=0, out=out), out)
+                np.testing.assert_allclose(
+                    out[:, 0], np.convolve(signal[:, 0], kernel)[:40], atol=1e-5)
+
+    def test_choose_method(self):
+        """Test if short kernels are convolved directly and long kernels
+        with long signals through the Fourier basis.
+        """
+        self.assertEqual(filtering.choose_method(2**16, 5), 'direct')
+        self.assertEqual(filtering.choose_method(2**16, 2**12), 'fft')
+        self.assertEqual(filtering.fast_length(1025), 1080)
+
+    def test_overlap_add_matches_fir_filter(self):
+        """Test if a stream of batches in chunks of any length is filtered
+        as the whole batch is, with short and long (Fourier) filters.
+        """
+        signal = np.random.randn(2, 3000)
+        for taps in (np.random.randn(9), np.random.randn(400)):
+            filtered = filtering.fir_filter(taps, signal, axis=1)
+            np.testing.assert_almost_equal(
+                filtered[1], np.convolve(signal[1], taps)[:3000])
+            stream = filtering.OverlapAdd(taps)
+            chunks = np.split(signal, [1, 500, 501, 2200], axis=1)
+            np.testing.assert_almost_equal(
+                np.concatenate([stream.update(chunk) for chunk in chunks], axis=1),
+                filtered)
+
+    def test_overlap_add_promotes_complex_samples(self):
+        """Test if complex samples filtered by real taps keep their
+        imaginary parts, with short and long (Fourier) filters.
+        """
+        signal = np.random.randn(1000) + 1j*np.random.randn(1000)
+        for taps in (np.random.randn(9), np.random.randn(400)):
+            stream = filtering.OverlapAdd(taps)
+            head = stream.update(signal.real[:300])
+            tail = stream.update(signal[300:])
+            np.testing.assert_almost_equal(
+                np.concatenate([head, tail]),
+                filtering.fir_filter(taps, np.concatenate([signal.real[:300],
+                                                           signal[300:]])))
+            stream.reset()
+            self.assertEqual(stream.update(signal.real).dtype, np.float64)
+
 
 class GeneralTests(unittest.TestCase):
     """Test cases for general functionality."""
@@ -200,6 +621,549 @@ class GeneralTests(unittest.TestCase):
         with self.assertRaises(NotImplementedError):
             bases.wavelets.get_family('Crazy')
 
+    def test_wisdom_saved_and_loaded(self):
+        """Test that stored plans can be saved to disk and loaded back
+        in place of building them again.
+        """
+        bases.fourier.plan(24)
+        bases.wavelets.plan(8, 'Haar')
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'wisdom.pickle')
+            bases.plans.save_wisdom(filename)
+            bases.plans.forget_wisdom()
+            bases.plans.load_wisdom(filename)
+        self.assertIn(('Fourier', 24, 'complex128'), bases.plans._wisdom)
+        self.assertIn(('Haar', 8, 'float64'), bases.plans._wisdom)
+        signal = np.random.rand(24)
+        np.testing.assert_almost_equal(bases.fourier.plan(24).execute(signal),
+                                       bases.fourier.idft(signal))
+
+    def test_basis_cache(self):
+        """Test that basis matrices are cached, read-only and evicted
+        (least recently used first) to keep within the cache's budget.
+        """
+        matrix = bases.fourier.fourier_matrix(12)
+        self.assertIs(bases.fourier.fourier_matrix(12), matrix)
+        self.assertFalse(matrix.flags.writeable)
+        with self.assertRaises(ValueError):
+            matrix[0, 0] = 0
+        cache = bases.cache.BasisCache(budget=3*8*8**2)
+        for m in [8, 8, 8, 8]:
+            cache.get('Haar', m, float, 'forward',
+                      lambda: bases.wavelets.Haar._matrix(m))
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+        for direction in ['inverse', 'other', 'another']:
+            cache.get('Haar', 8, float, direction, lambda: np.eye(8))
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.nbytes, 3*8*8**2)
+        cache.get('Haar', 8, float, 'inverse', lambda: np.eye(8))
+        self.assertEqual(cache.hits, 4)
+
+    def test_basis_cache_is_thread_safe(self):
+        """Test that concurrent misses and hits from threads keep the
+        cache's byte count equal to the size of the stored matrices and
+        within budget, and that each key gets a single plan.
+        """
+        cache = bases.cache.BasisCache(budget=5*8*8**2)
+
+        def build():
+            time.sleep(0.001)
+            return np.eye(8)
+
+        def work(i):
+            return cache.get('Haar', 8, float, str(i % 7), build)
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            list(executor.map(work, range(200)))
+            plans = list(executor.map(lambda i: bases.fourier.plan(2*3*5*7*i),
+                                      [11]*8))
+        self.assertEqual(cache.nbytes, sum(m.nbytes for m in cache._matrices.values()))
+        self.assertLessEqual(cache.nbytes, cache.budget)
+        self.assertEqual(cache.stats()['hits'] + cache.stats()['misses'], 200)
+        self.assertTrue(all(plan is bases.fourier.plan(2310) for plan in plans))
+
+
+class BatchTests(unittest.TestCase):
+    """Test cases for transforms along the axes of stacks of signals."""
+
+    def test_1d_transforms_along_axis(self):
+        """Test that transforming a stack of signals along an axis gives
+        the same results as transforming each signal separately.
+        """
+        stack = np.random.rand(16, 5)
+        transforms = [bases.fourier.idft, bases.fourier.dft,
+                      bases.fourier.ifft, bases.fourier.fft,
+                      lambda x, **kw: bases.wavelets.idwt(x, 'Haar', **kw),
+                      lambda x, **kw: bases.wavelets.dwt(x, 'Haar', **kw)]
+        for transform in transforms:
+            expected = np.column_stack([transform(s) for s in stack.T])
+            np.testing.assert_almost_equal(transform(stack, axis=0), expected)
+            np.testing.assert_almost_equal(transform(stack.T, axis=-1),
+                                           expected.T)
+
+    def test_2d_transforms_along_axes(self):
+        """Test that transforming a stack of images along two axes gives
+        the same results as transforming each image separately.
+        """
+        stack = np.random.rand(3, 8, 4)
+        expected = np.array([bases.fourier.idft2(image) for image in stack])
+        np.testing.assert_almost_equal(
+            bases.fourier.idft2(stack, axes=(1, 2)), expected)
+        np.testing.assert_almost_equal(
+            bases.fourier.dft2(expected, axes=(1, 2)), stack)
+        haar = bases.wavelets.Haar
+        expected = np.array([haar.imatrix(8).dot(image).dot(haar.imatrix(4).T)
+                             for image in stack])
+        np.testing.assert_almost_equal(
+            bases.wavelets.idwt2(stack, 'Haar', axes=(1, 2)), expected)
+
+    def test_2d_transforms_in_tiles(self):
+        """Test that the separable 2-dimensional transforms give the same
+        results when the image is split into many tiles and that dwt2 is
+        the inverse of idwt2.
+        """
+        image = np.random.rand(32, 16)
+        fourier = bases.fourier.ifourier_matrix
+        expected = fourier(32).dot(image).dot(fourier(16))
+        tile_bytes = bases.batch.TILE_BYTES
+        try:
+            bases.batch.TILE_BYTES = 64
+            coeffs = bases.fourier.idft2(image)
+            np.testing.assert_almost_equal(coeffs, expected)
+            np.testing.assert_almost_equal(bases.fourier.dft2(coeffs), image)
+            coeffs = bases.wavelets.idwt2(image, 'Haar')
+            np.testing.assert_almost_equal(
+                bases.wavelets.dwt2(coeffs, 'Haar'), image)
+        finally:
+            bases.batch.TILE_BYTES = tile_bytes
+
+    def test_out_is_written(self):
+        """Test that the results are written into (and returned as) the
+        output array when one is given.
+        """
+        stack = np.random.rand(4, 32)
+        out = np.empty((4, 32), dtype=complex)
+        self.assertIs(bases.fourier.ifft(stack, axis=1, out=out), out)
+        np.testing.assert_almost_equal(out, bases.fourier.idft(stack, axis=1))
+        out = np.empty((4, 32))
+        self.assertIs(bases.wavelets.idwt(stack, 'Haar', axis=1, out=out), out)
+        np.testing.assert_almost_equal(out[1], bases.wavelets.idwt(stack[1], 'Haar'))
+        for m in (30, 17):
+            signal = np.random.rand(m, 3)
+            out = np.empty((m, 3), dtype=complex)
+            self.assertIs(bases.fourier.fft(signal, axis=0, out=out), out)
+            np.testing.assert_almost_equal(out, bases.fourier.dft(signal, axis=0))
+            out = np.empty((m//2 + 1, 3), dtype=complex)
+            self.assertIs(bases.fourier.irfft(signal, axis=0, out=out), out)
+            real = np.empty((m, 3))
+            self.assertIs(bases.fourier.rfft(out, m, axis=0, out=real), real)
+            np.testing.assert_almost_equal(real, signal)
+        out = np.empty((4, 45))
+        self.assertIs(bases.wavelets.idwt(stack, 'db4', axis=1, out=out,
+                                          mode='symmetric'), out)
+        real = np.empty((4, 32))
+        self.assertIs(bases.wavelets.dwt(out, 'db4', axis=1, out=real,
+                                         mode='symmetric', m=32), real)
+        np.testing.assert_almost_equal(real, stack)
+
+
+class PrecisionTests(unittest.TestCase):
+    """Test cases for transforms computed in single precision."""
+
+    def assert_within_bound(self, single, double):
+        """Assert that the single precision result is within the
+        documented relative error of the double precision result.
+        """
+        error = np.linalg.norm(single - double)/np.linalg.norm(double)
+        self.assertLess(error, bases.batch.SINGLE_PRECISION_ERROR)
+
+    def test_single_precision_transforms(self):
+        """Test that single precision signals are transformed in single
+        precision to within the documented error bound.
+        """
+        for m in [64, 97, 4096]:
+            signal = np.random.rand(m)
+            single = bases.fourier.ifft(signal.astype(np.float32))
+            self.assertEqual(single.dtype, np.complex64)
+            self.assert_within_bound(single, bases.fourier.ifft(signal))
+            signal = bases.fourier.fft(single)
+            self.assertEqual(signal.dtype, np.complex64)
+        signal = np.random.rand(256)
+        single = bases.fourier.idft(signal, dtype=np.complex64)
+        self.assertEqual(single.dtype, np.complex64)
+        self.assert_within_bound(single, bases.fourier.idft(signal))
+        single = bases.wavelets.idwt(signal.astype(np.float32), 'Haar')
+        self.assertEqual(single.dtype, np.float32)
+        self.assert_within_bound(single, bases.wavelets.idwt(signal, 'Haar'))
+        image = np.random.rand(32, 16)
+        for transform in [bases.fourier.idft2,
+                          lambda x, **kw: bases.wavelets.idwt2(x, 'Haar', **kw)]:
+            single = transform(image, dtype=np.float32)
+            self.assertIn(single.dtype, [np.float32, np.complex64])
+            self.assert_within_bound(single, transform(image))
+
+    def test_single_precision_bases(self):
+        """Test that the basis matrices and plans are built (and cached)
+        in single precision.
+        """
+        self.assertEqual(bases.fourier.fourier_matrix(8, np.complex64).dtype,
+                         np.complex64)
+        self.assertEqual(bases.wavelets.Haar.imatrix(8, np.float32).dtype,
+                         np.float32)
+        plan = bases.wavelets.plan(8, 'Haar', np.float32)
+        self.assertEqual(plan.execute(np.random.rand(8)).dtype, np.float32)
+        plan = bases.fourier.plan(30, np.complex64)
+        self.assertEqual(plan.twiddles.dtype, np.complex64)
+
+
+class StreamingTests(unittest.TestCase):
+    """Test cases for transforms of streams of chunks."""
+
+    def test_stft_frames(self):
+        """Test that the short-time Fourier coefficients are those of
+        each windowed frame of the signal.
+        """
+        signal = np.random.rand(40)
+        window = np.hanning(16)
+        frames = bases.fourier.stft(signal, 16, 8, window)
+        self.assertEqual(frames.shape, (4, 16))
+        np.testing.assert_almost_equal(
+            frames[2], bases.fourier.idft(signal[16:32]*window))
+
+    def test_streaming_stft_matches_batch(self):
+        """Test that the short-time Fourier transform of a stream sent
+        in chunks of different lengths is the same as that of the whole
+        signal, including when the hop is longer than the frame.
+        """
+        signal = np.random.rand(500)
+        sizes = np.random.randint(0, 40, size=50)
+        chunks = np.split(signal, np.cumsum(sizes)[np.cumsum(sizes) < 500])
+        for hop in [4, 16, 23]:
+            expected = bases.fourier.stft(signal, 16, hop)
+            frames = list(streaming.stft_frames(chunks, 16, hop))
+            np.testing.assert_almost_equal(np.array(frames), expected)
+
+    def test_haar_decomposer_matches_idwt(self):
+        """Test that the coefficients emitted by the Haar decomposer of a
+        stream sent in chunks are those of the whole signal, and that a
+        snapshot continues independently of the original.
+        """
+        signal = np.random.rand(64)
+        decomposer = streaming.HaarDecomposer()
+        details = {}
+        for chunk in np.split(signal, [5, 6, 20, 33, 63]):
+            for level, index, values in decomposer.update(chunk):
+                self.assertEqual(index, len(details.get(level, [])))
+                details[level] = np.append(details.get(level, []), values)
+            if len(details.get(1, [])) == 10:
+                snapshot = decomposer.snapshot()
+        coeffs = np.concatenate([[decomposer.approximation()]] +
+                                [details[level] for level in range(6, 0, -1)])
+        np.testing.assert_almost_equal(coeffs,
+                                       bases.wavelets.idwt(signal, 'Haar'))
+        self.assertEqual(snapshot.counts[0], 10)
+        decomposer.reset()
+        self.assertEqual(decomposer.update([1.0]), [])
+
+    def test_streams_precision(self):
+        """Test that the streaming transforms compute in the precision of
+        the dtype given.
+        """
+        signal = np.random.rand(64)
+        details = streaming.HaarDecomposer(np.float32).update(signal)
+        self.assertEqual(details[0][2].dtype, np.float32)
+        frames = streaming.stft(16, dtype=np.float32).send(signal)
+        self.assertEqual(frames.dtype, np.complex64)
+        np.testing.assert_allclose(frames, bases.fourier.stft(signal, 16),
+                                   atol=1e-5)
+
+
+class CompressionTests(unittest.TestCase):
+    """Test cases for compression by thresholding coefficients."""
+
+    def test_thresholds(self):
+        """Test the hard, soft, top-k and energy fraction thresholds."""
+        coeffs = np.array([4, -0.5, 2, 0.1, -3])
+        np.testing.assert_equal(compression.hard(coeffs, 1), [4, 0, 2, 0, -3])
+        np.testing.assert_equal(compression.soft(coeffs, 1), [3, 0, 1, 0, -2])
+        np.testing.assert_equal(compression.top_k(coeffs, 2), [4, 0, 0, 0, -3])
+        np.testing.assert_equal(compression.energy(coeffs, 0.9),
+                                [4, 0, 2, 0, -3])
+        with self.assertRaises(NotImplementedError):
+            compression.threshold(coeffs, 'crazy', 1)
+
+    def test_compress_and_reconstruct(self):
+        """Test that a square wave is losslessly compressed into a few
+        Haar coefficients with small indices, and that sparse
+        coefficients are saved and loaded in bulk.
+        """
+        square = signals.square_signal(128)
+        sparse = compression.compress(square, 'Haar', 'hard', 1e-9)
+        self.assertEqual(len(sparse.values), 3)
+        self.assertEqual(sparse.indices.dtype, np.uint8)
+        np.testing.assert_almost_equal(sparse.reconstruct(), square)
+        image = signals.chequered(8, 8, 2)
+        fourier = compression.compress(image, 'Fourier', 'top_k', 10,
+                                       dtype=np.complex64)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'sparse.npz')
+            compression.save(filename, [sparse, fourier])
+            loaded = compression.load(filename)
+        self.assertEqual(loaded[1].header(), fourier.header())
+        np.testing.assert_equal(loaded[0].dense(), sparse.dense())
+        np.testing.assert_almost_equal(loaded[1].reconstruct().real,
+                                       image, decimal=3)
+
+
+class OutOfCoreTests(unittest.TestCase):
+    """Test cases for transforms of recordings through memory maps."""
+
+    def test_batch_of_signals(self):
+        """Test that each row of a recording is transformed in chunks of
+        rows and written to the destination file.
+        """
+        recording = np.random.rand(10, 16)
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'source.npy')
+            destination = os.path.join(directory, 'destination.npy')
+            np.save(source, recording)
+            calls = []
+            outofcore.transform(source, destination, 'Fourier', chunk=3,
+                                progress=lambda *done: calls.append(done))
+            coeffs = np.load(destination)
+            self.assertEqual(calls[-1], (4, 4))
+            np.testing.assert_almost_equal(
+                coeffs, bases.fourier.idft(recording, axis=1))
+            outofcore.transform(destination, source, 'Fourier', inverse=True)
+            np.testing.assert_almost_equal(np.load(source).real, recording)
+
+    def test_long_signal_in_chunks_resumed(self):
+        """Test that a long signal transformed in chunks (and resumed from
+        a checkpoint after being interrupted) has the same Haar wavelet
+        coefficients as the whole signal, and is reconstructed from them.
+        """
+        signal = np.random.rand(256)
+        with tempfile.TemporaryDirectory() as directory:
+            destination = os.path.join(directory, 'destination.npy')
+            checkpoint = os.path.join(directory, 'checkpoint.json')
+
+            def interrupt(done, total):
+                if done == 3:
+                    raise KeyboardInterrupt()
+            with self.assertRaises(KeyboardInterrupt):
+                outofcore.transform(signal, destination, 'Haar', chunk=16,
+                                    progress=interrupt, checkpoint=checkpoint)
+            calls = []
+            outofcore.transform(signal, destination, 'Haar', chunk=16,
+                                progress=lambda *done: calls.append(done),
+                                checkpoint=checkpoint)
+            self.assertEqual(calls[0], (4, 16))
+            self.assertFalse(os.path.exists(checkpoint))
+            coeffs = np.load(destination)
+            np.testing.assert_almost_equal(
+                coeffs, bases.wavelets.idwt(signal, 'Haar'))
+            reconstructed = os.path.join(directory, 'reconstructed.npy')
+            outofcore.transform(destination, reconstructed, 'Haar',
+                                inverse=True, chunk=32)
+            np.testing.assert_almost_equal(np.load(reconstructed), signal)
+
+    def test_long_signal_resumed_after_second_pass(self):
+        """Test that a job interrupted after the second pass has written
+        its result, but before it is recorded, is resumed without
+        decomposing the approximations twice, and that a destination of
+        another shape is not resumed into.
+        """
+        signal = np.random.rand(256)
+        complete = outofcore._complete
+
+        def interrupt(out, done, total, *args):
+            if done > total:
+                raise KeyboardInterrupt()
+            complete(out, done, total, *args)
+        with tempfile.TemporaryDirectory() as directory:
+            destination = os.path.join(directory, 'destination.npy')
+            checkpoint = os.path.join(directory, 'checkpoint.json')
+            with mock.patch.object(outofcore, '_complete', interrupt):
+                with self.assertRaises(KeyboardInterrupt):
+                    outofcore.transform(signal, destination, 'Haar', chunk=16,
+                                        checkpoint=checkpoint)
+            outofcore.transform(signal, destination, 'Haar', chunk=16,
+                                checkpoint=checkpoint)
+            np.testing.assert_almost_equal(np.load(destination),
+                                           bases.wavelets.idwt(signal, 'Haar'))
+            with mock.patch.object(outofcore, '_complete', interrupt):
+                with self.assertRaises(KeyboardInterrupt):
+                    outofcore.transform(signal, destination, 'Haar', chunk=16,
+                                        checkpoint=checkpoint)
+            with self.assertRaises(ValueError):
+                outofcore.transform(signal[:128], destination, 'Haar', chunk=16,
+                                    checkpoint=checkpoint)
+
+
+class ParallelTests(unittest.TestCase):
+    """Test cases for batch transforms across worker processes."""
+
+    def test_executor_matches_batch_transforms(self):
+        """Test that transforms across a pool of workers give the same
+        results, in the same order, as the batch transforms.
+        """
+        signals_1d = np.random.rand(13, 16)
+        images = np.random.rand(5, 8, 4)
+        with parallel.Executor(workers=2, chunk=3) as executor:
+            np.testing.assert_almost_equal(
+                executor.transform('ifft', signals_1d),
+                bases.fourier.idft(signals_1d, axis=1))
+            np.testing.assert_almost_equal(
+                executor.transform('idwt2', images, 'Haar'),
+                bases.wavelets.idwt2(images, 'Haar', axes=(1, 2)))
+            with self.assertRaises(ValueError):
+                executor.transform('idft2', signals_1d)
+            with self.assertRaises(NotImplementedError):
+                executor.transform('crazy', signals_1d)
+
+    def test_executor_handles_changed_lengths(self):
+        """Test that transforms whose results are longer than the signals
+        (filter banks in the symmetric mode) are gathered whole.
+        """
+        signals_1d = np.random.rand(7, 16)
+        with parallel.Executor(workers=2, chunk=2) as executor:
+            coeffs = executor.transform('idwt', signals_1d, 'db2', mode='symmetric')
+            np.testing.assert_almost_equal(
+                coeffs, bases.wavelets.idwt(signals_1d, 'db2', axis=1, mode='symmetric'))
+            np.testing.assert_almost_equal(
+                executor.transform('dwt', coeffs, 'db2', mode='symmetric', m=16),
+                signals_1d)
+
+
+class InstrumentationTests(unittest.TestCase):
+    """Test cases for the instrumentation of function calls."""
+
+    def test_collecting(self):
+        """Test that calls, timings and basis counters are collected (and
+        passed to the sink) only within the scope of collection.
+        """
+        signal = np.random.rand(20)
+        measurements = []
+        bases.cache.basis_cache.clear()
+        with sp.instrumentation.collecting(lambda *m: measurements.append(m)):
+            bases.fourier.idft(signal)
+            bases.fourier.idft(signal)
+            stats = sp.stats()
+        bases.fourier.idft(signal)
+        timings = stats['timings']['bases.fourier.idft']
+        self.assertEqual(timings['calls'], 2)
+        self.assertLessEqual(timings['p50'], timings['p99'])
+        self.assertEqual(stats['timings']['bases.fourier.ifourier_matrix']['calls'], 2)
+        self.assertEqual(stats['counters']['basis_cache_hits'], 1)
+        self.assertEqual(stats['counters']['basis_bytes'], 20*20*16)
+        self.assertIn(('count', 'basis_bytes', 20*20*16), measurements)
+        self.assertEqual(sp.stats()['timings']['bases.fourier.idft']['calls'], 2)
+
+
+class ServiceTests(unittest.TestCase):
+    """Test cases for the micro-batching transform service."""
+
+    def test_requests_are_batched(self):
+        """Test that concurrent requests are coalesced into batches of
+        their kind (of at most the batch size) and each is resolved with
+        the transform of its own signal.
+        """
+        signals_1d = np.random.rand(10, 16)
+
+        async def main():
+            transforms = service.Service(window=0.01, batch=4)
+            results = await asyncio.gather(
+                *[transforms.transform('ifft', signal) for signal in signals_1d],
+                *[transforms.transform('idwt', signal, 'db2') for signal in signals_1d[:3]])
+            return results, transforms.stats()
+
+        results, stats = asyncio.run(main())
+        np.testing.assert_almost_equal(results[:10],
+                                       bases.fourier.idft(signals_1d, axis=1))
+        np.testing.assert_almost_equal(results[10:],
+                                       bases.wavelets.idwt(signals_1d[:3], 'db2', axis=1))
+        self.assertEqual(stats['requests'], 13)
+        self.assertEqual(stats['batches'], 4)
+        self.assertEqual(stats['pending'] + stats['queued'] + stats['running'], 0)
+        self.assertEqual(stats['latency']['calls'], 13)
+
+    def test_backpressure_and_errors(self):
+        """Test that no more than the pending requests are admitted at
+        once and that errors are raised in the requests that caused them.
+        """
+        async def main():
+            transforms = service.Service(window=0.01, pending=2)
+            requests = [asyncio.ensure_future(transforms.transform('idft', np.ones(4)))
+                        for _ in range(3)]
+            await asyncio.sleep(0)
+            admitted = transforms.stats()['pending']
+            await asyncio.gather(*requests)
+            with self.assertRaises(NotImplementedError):
+                await transforms.transform('crazy', np.ones(4))
+            with self.assertRaises(ValueError):
+                await transforms.transform('idft2', np.ones(4))
+            with self.assertRaises(NotImplementedError):
+                await transforms.transform('idwt', np.ones(4), 'crazy')
+            return admitted, transforms.stats()['pending']
+
+        self.assertEqual(asyncio.run(main()), (2, 0))
+
+    def test_module_transform(self):
+        """Test that the module's transform batches concurrent requests
+        through the default service of the running loop, whose slots are
+        created in that loop, giving each signal's coefficients.
+        """
+        signals_1d, image = np.random.rand(6, 16), np.random.rand(8, 8)
+        self.assertIsNone(service.Service().slots)
+
+        async def main():
+            results = await asyncio.gather(
+                *[service.transform(signal, 'fourier') for signal in signals_1d],
+                service.transform(signals_1d[0], 'db2'),
+                service.transform(image, 'Haar'))
+            return results, service.default().stats()
+
+        for _ in range(2):
+            results, stats = asyncio.run(main())
+            np.testing.assert_almost_equal(results[:6],
+                                           bases.fourier.ifft(signals_1d, axis=1))
+            np.testing.assert_almost_equal(
+                results[6], bases.wavelets.idwt(signals_1d[0], 'db2'))
+            np.testing.assert_almost_equal(results[7],
+                                           bases.wavelets.idwt2(image, 'Haar'))
+            self.assertEqual((stats['requests'], stats['batches']), (8, 3))
+
+    def test_socket_server(self):
+        """Test that requests sent over a socket, several at once, are
+        replied to with their transforms, and failures with their error.
+        """
+        signal = np.random.rand(8)
+
+        async def main():
+            transforms = service.Service()
+            server = await transforms.serve()
+            reader, writer = await asyncio.open_connection(
+                *server.sockets[0].getsockname()[:2])
+            for i in range(3):
+                service.write_message(writer, {'id': i, 'name': 'idwt', 'args': ['Haar']},
+                                      signal*i)
+            replies = [await service.read_message(reader) for _ in range(3)]
+            result = await service.request(reader, writer, 'ifft', signal)
+            with self.assertRaises(RuntimeError):
+                await service.request(reader, writer, 'crazy', signal)
+            writer.close()
+            await writer.wait_closed()
+            server.close()
+            await server.wait_closed()
+            return replies, result
+
+        replies, result = asyncio.run(main())
+        for header, body in replies:
+            header = json.loads(header)
+            np.testing.assert_almost_equal(
+                np.frombuffer(body, dtype=header['dtype']),
+                bases.wavelets.idwt(signal*header['id'], 'Haar'))
+        np.testing.assert_almost_equal(result, bases.fourier.idft(signal))
+
 
 class SignalsTests(unittest.TestCase):
     """Test cases for signals functionality."""
@@ -214,6 +1178,152 @@ class SignalsTests(unittest.TestCase):
         self.assertEqual(signals.vertical_sinusoids(20, 100, 2).shape, (20, 100))
         self.assertEqual(signals.horizontal_sinusoids(20, 100, 2).shape, (20, 100))
 
+    def test_signals_values(self):
+        """Test that the signals have the same values as those built
+        component by component and chequer by chequer.
+        """
+        amps_freqs = [[3, 17], [8, 26], [2, 29]]
+        expected = np.zeros(64)
+        for amp, freq in amps_freqs:
+            expected += amp*np.cos(2*np.pi*freq*1/64*np.arange(0, 64))
+        np.testing.assert_equal(signals.sum_of_sinusoids(64, amps_freqs),
+                                expected)
+        expected = np.zeros((5, 7))
+        for i, j in np.ndindex(5, 7):
+            expected[i, j] = 255 if (i//2 + j//2) % 2 else 0
+        np.testing.assert_equal(signals.chequered(5, 7, 2), expected)
+
+    def test_signals_batched(self):
+        """Test that batches of parameters give a batch of signals, each
+        the same as the signal of its parameters, in the dtype asked for
+        and written into out if given.
+        """
+        amps_freqs = np.random.rand(4, 3, 2)*10
+        batch = signals.sum_of_sinusoids(32, amps_freqs)
+        self.assertEqual(batch.shape, (4, 32))
+        for s, a in zip(batch, amps_freqs):
+            np.testing.assert_equal(s, signals.sum_of_sinusoids(32, a))
+        batch = signals.chequered(8, 6, [1, 2, 3])
+        np.testing.assert_equal(batch[2], signals.chequered(8, 6, 3))
+        batch = signals.horizontal_sinusoids(8, 6, [1, 2], dtype=np.float32)
+        self.assertEqual(batch.dtype, np.float32)
+        np.testing.assert_almost_equal(batch[1],
+                                       signals.horizontal_sinusoids(8, 6, 2))
+        out = np.empty((2, 8, 6))
+        self.assertIs(signals.stripes(8, 6, [1, 2], out=out), out)
+        np.testing.assert_equal(out[0], signals.stripes(8, 6, 1))
+
+    def test_signals_written_into_out(self):
+        """Test that a sum of sinusoids written into out is computed in
+        its dtype, one sinusoid at a time, without a float64 array of
+        every sinusoid.
+        """
+        m, amps_freqs = 2**14, np.random.rand(16, 2)*10
+        out = np.empty(m, dtype=np.float32)
+        tracemalloc.start()
+        self.assertIs(signals.sum_of_sinusoids(m, amps_freqs, out=out), out)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertLess(peak, 4*m*out.itemsize)
+        np.testing.assert_allclose(out, signals.sum_of_sinusoids(m, amps_freqs),
+                                   atol=1e-3)
+
+
+class PlottingTests(unittest.TestCase):
+    """Test cases for plotting (with the non-interactive backend)."""
+
+    def setUp(self):
+        import matplotlib
+        matplotlib.use('Agg')
+        self.plt = sp.plotting.plt
+
+    def tearDown(self):
+        self.plt.close('all')
+
+    def test_decimate_keeps_envelope(self):
+        """Test if decimation gives two points per column which keep the
+        minimum and maximum of each column's samples.
+        """
+        signal = np.random.rand(1000)
+        x, y = sp.plotting.decimate(signal, 100)
+        self.assertEqual(len(x), 200)
+        np.testing.assert_equal(y[0::2], signal.reshape(100, 10).min(axis=1))
+        np.testing.assert_equal(y[1::2], signal.reshape(100, 10).max(axis=1))
+        x, y = sp.plotting.decimate(signal[:150], 100)
+        np.testing.assert_equal(y, signal[:150])
+
+    def test_live_plot_reuses_artists(self):
+        """Test if the live plot keeps the same (bounded) artists as new
+        signals are sent, with the newest signal in the first of them.
+        """
+        view = sp.plotting.plot(np.random.rand(100), live=True, history=2)
+        view.send(np.random.rand(100))
+        ax = self.plt.gcf().axes[0]
+        artists = ax.get_children()
+        for _ in range(5):
+            signal = np.random.rand(100)
+            view.send(signal)
+        self.assertEqual(ax.get_children(), artists)
+        np.testing.assert_equal(ax.lines[0].get_ydata(), signal)
+        self.assertEqual(len(ax.lines), 2)
+
+    def test_plot_keeps_history(self):
+        """Test if the overlaid plot keeps only the latest signals."""
+        view = sp.plotting.plot(np.random.rand(8, 8), history=2)
+        for _ in range(3):
+            view.send(np.random.rand(8, 8))
+        self.assertEqual(len(self.plt.gcf().axes), 2)
+
+    def test_heatmap_annotates_small_matrices(self):
+        """Test if only heatmaps below the threshold are annotated."""
+        sp.plotting.plot_wavelet_heatmap(np.random.rand(8), 'Haar')
+        self.assertEqual(len(self.plt.gca().texts), 8*4)
+        sp.plotting.plot_wavelet_heatmap(np.random.rand(512), 'Haar')
+        self.assertEqual(len(self.plt.gca().texts), 0)
+
+
+class ImportTests(unittest.TestCase):
+    """Test cases for the cost of importing the package."""
+
+    # The budget of importing sp (numpy already imported).
+    SECONDS = 0.25
+    BYTES = 2**20
+
+    def test_import_is_lazy_and_cheap(self):
+        """Test if importing sp, in a fresh interpreter, stays within the
+        time and memory budget and neither imports matplotlib nor
+        registers the wavelet families until they are first used.
+        """
+        script = (
+            'import json, sys, time, tracemalloc\n'
+            'import numpy\n'
+            'tracemalloc.start()\n'
+            'start = time.perf_counter()\n'
+            'import sp\n'
+            'seconds = time.perf_counter() - start\n'
+            'peak = tracemalloc.get_traced_memory()[1]\n'
+            'lazy = [name for name in sys.modules\n'
+            '        if name.startswith(("matplotlib", "sp.plotting", "sp.bases"))]\n'
+            'sp.bases.wavelets.idwt(numpy.ones(4), "Haar")\n'
+            'print(json.dumps([seconds, peak, lazy,\n'
+            '                  "sp.bases.wavelets.families" in sys.modules]))\n')
+        directory = os.path.dirname(os.path.abspath(__file__))
+        output = subprocess.check_output([sys.executable, '-c', script], cwd=directory)
+        seconds, peak, lazy, registered = json.loads(output)
+        self.assertLess(seconds, self.SECONDS)
+        self.assertLess(peak, self.BYTES)
+        self.assertEqual(lazy, [])
+        self.assertTrue(registered)
+
+    def test_public_api_is_unchanged(self):
+        """Test if the submodules and names are reachable as attributes."""
+        self.assertIs(sp.stats, sp.instrumentation.stats)
+        self.assertIs(bases.wavelets.Haar, bases.wavelets.families.Haar)
+        self.assertTrue(bases.wavelets.is_implemented('Haar'))
+        self.assertIn('plotting', dir(sp))
+        with self.assertRaises(AttributeError):
+            sp.missing
+
 
 if __name__ == "__main__":
     unittest.main()